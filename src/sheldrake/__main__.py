@@ -2,22 +2,26 @@
 
 from __future__ import annotations
 
-import typer
+import argparse
 
 from sheldrake.config import DEFAULT_MODEL
 
-app = typer.Typer(add_completion=False)
 
-
-@app.command()
-def main(
-    model: str = typer.Option(DEFAULT_MODEL, help="Anthropic model ID"),
-    debug: bool = typer.Option(False, help="Show debug panel with raw token stream"),
-) -> None:
+def app(argv: list[str] | None = None) -> None:
     """Sheldrake — Where AI learns to use the backspace key."""
+    parser = argparse.ArgumentParser(prog="sheldrake", description=app.__doc__)
+    parser.add_argument("--model", default=DEFAULT_MODEL, help="Anthropic model ID")
+    parser.add_argument(
+        "--debug",
+        action=argparse.BooleanOptionalAction,
+        default=False,
+        help="Show debug panel with raw token stream",
+    )
+    args = parser.parse_args(argv)
+
     from sheldrake.app import SheldrakeApp
 
-    tui = SheldrakeApp(model=model, debug=debug)
+    tui = SheldrakeApp(model=args.model, debug=args.debug)
     tui.run()
 
 
@@ -4,10 +4,11 @@ Textual's Win32 EventMonitor uses ENABLE_VIRTUAL_TERMINAL_INPUT, which zeroes
 out dwControlKeyState and wVirtualKeyCode in KEY_EVENT_RECORD. This makes
 Shift+Enter indistinguishable from Enter.
 
-Fix: read one input record at a time so that when '\r' arrives we can
-immediately poll GetAsyncKeyState for modifier keys. Reading single records
-minimizes the window between the physical keypress and the poll, reducing
-the race condition where a user releases Shift before the batch is processed.
+Fix: when a '\r' record is dequeued, immediately poll GetAsyncKeyState for
+modifier keys. Records are read in small batches and the poll happens while
+walking the batch, so the window between the physical keypress and the poll
+stays within microseconds of dequeue — short enough that a user releasing
+Shift right after Enter is still seen as holding it.
 If Shift/Ctrl/Alt is held, inject a Kitty CSI u sequence (\x1b[13;Nu)
 so the XTermParser produces 'shift+enter' etc.
 
@@ -17,8 +18,31 @@ Tracks: https://github.com/Textualize/textual/issues/6074
 
 from __future__ import annotations
 
+import re
 import sys
 
+# High surrogate followed by low surrogate, as split across two KEY_EVENTs.
+_SURROGATE_PAIR_RE = re.compile("[\ud800-\udbff][\udc00-\udfff]")
+
+
+def _combine_pair(match: re.Match[str]) -> str:
+    """Combine a UTF-16 surrogate pair into its astral code point."""
+    high, low = match.group()
+    return chr(0x10000 + ((ord(high) - 0xD800) << 10) + (ord(low) - 0xDC00))
+
+
+def _join_utf16(keys: list[str]) -> str:
+    """Join UTF-16 code units read from the console into a str.
+
+    Each KEY_EVENT carries one UTF-16 code unit, so characters outside the BMP
+    arrive as two surrogates that must be glued back together. ASCII input —
+    the common case — is returned as-is.
+    """
+    text = "".join(keys)
+    if text.isascii():
+        return text
+    return _SURROGATE_PAIR_RE.sub(_combine_pair, text)
+
 
 def apply() -> None:
     """Patch EventMonitor.run to detect modifier+Enter via GetAsyncKeyState."""
@@ -26,10 +50,12 @@ def apply() -> None:
         return
 
     import ctypes
+    import math
     from ctypes import byref
-    from ctypes.wintypes import DWORD
+    from ctypes.wintypes import BOOL, DWORD, HANDLE
 
     from textual import constants
+    from textual._time import get_time
     from textual._xterm_parser import XTermParser
     from textual.drivers.win32 import (
         INPUT_RECORD,
@@ -49,6 +75,17 @@ def apply() -> None:
     _VK_CONTROL = 0x11
     _VK_MENU = 0x12  # Alt
 
+    # Manual-reset event signalled alongside exit_event, so the monitor can block
+    # on console input without a polling tick and still exit immediately.
+    _CreateEventW = KERNEL32.CreateEventW
+    _CreateEventW.argtypes = [ctypes.c_void_p, BOOL, BOOL, ctypes.c_wchar_p]
+    _CreateEventW.restype = HANDLE
+    _SetEvent = KERNEL32.SetEvent
+    _SetEvent.argtypes = [HANDLE]
+    _CloseHandle = KERNEL32.CloseHandle
+    _CloseHandle.argtypes = [HANDLE]
+    _IDLE_WAIT_MS = 500
+
     def _poll_modifier_param() -> int:
         """Poll current modifier key state, return Kitty CSI u parameter."""
         bits = 0
@@ -60,73 +97,118 @@ def apply() -> None:
             bits |= 4
         return bits + 1 if bits else 0
 
+    def _wait_timeout_ms(parser: XTermParser) -> int:
+        """Wait until a pending escape sequence times out, else up to the idle cap."""
+        deadline = parser._timeout_time
+        if deadline is None:
+            return _IDLE_WAIT_MS
+        return max(0, math.ceil((deadline - get_time()) * 1000))
+
+    KEY_EVENT = 0x0001
+    WINDOW_BUFFER_SIZE_EVENT = 0x0004
+    MAX_EVENTS = 64
+    # Input arriving within _BURST_GAP of the previous batch is treated as a
+    # paste/typing burst and coalesced for up to _COALESCE_WINDOW; an isolated
+    # keystroke is fed to the parser immediately.
+    _BURST_GAP = 0.005
+    _COALESCE_WINDOW = 0.016
+    _COALESCE_POLL_MS = 2
+
+    def _drain_input(
+        hIn: int, input_records: ctypes.Array, read_count: DWORD, keys: list[str]
+    ) -> tuple[int, int] | None:
+        """Read all pending console records into keys; return the latest new size."""
+        append_key = keys.append
+        new_size: tuple[int, int] | None = None
+        while True:
+            KERNEL32.ReadConsoleInputW(hIn, byref(input_records), MAX_EVENTS, byref(read_count))
+            count = read_count.value
+
+            for index in range(count):
+                input_record = input_records[index]
+                event_type = input_record.EventType
+
+                if event_type == KEY_EVENT:
+                    key_event = input_record.Event.KeyEvent
+                    key = key_event.uChar.UnicodeChar
+                    if key_event.bKeyDown:
+                        if key_event.dwControlKeyState and key_event.wVirtualKeyCode == 0:
+                            pass
+                        elif key == "\r":
+                            mod = _poll_modifier_param()
+                            if mod > 1:
+                                keys.extend(f"\x1b[13;{mod}u")
+                            else:
+                                append_key(key)
+                        else:
+                            append_key(key)
+                elif event_type == WINDOW_BUFFER_SIZE_EVENT:
+                    size = input_record.Event.WindowBufferSizeEvent.dwSize
+                    new_size = (size.X, size.Y)
+
+            # Only a full batch can leave records behind; ReadConsoleInputW
+            # would block on an empty queue, so check before reading again.
+            if count < MAX_EVENTS:
+                return new_size
+            pending = DWORD(0)
+            KERNEL32.GetNumberOfConsoleInputEvents(hIn, byref(pending))
+            if pending.value == 0:
+                return new_size
+
     def _patched_run(self: EventMonitor) -> None:
-        exit_requested = self.exit_event.is_set
+        exit_event = self.exit_event
+        exit_requested = exit_event.is_set
         parser = XTermParser(debug=constants.DEBUG)
-        KEY_EVENT = 0x0001
-        WINDOW_BUFFER_SIZE_EVENT = 0x0004
+        wake = _CreateEventW(None, True, False, None)
+        set_exit = exit_event.set
+
+        def set_exit_and_wake() -> None:
+            set_exit()
+            _SetEvent(wake)
+
+        exit_event.set = set_exit_and_wake
 
         try:
             read_count = DWORD(0)
             hIn = GetStdHandle(STD_INPUT_HANDLE)
-            # Read one record at a time to minimize the race window between
-            # the physical keypress and the GetAsyncKeyState poll.
-            input_record = INPUT_RECORD()
-            ReadConsoleInputW = KERNEL32.ReadConsoleInputW
+            # Small batches keep the '\r' → GetAsyncKeyState poll close to dequeue.
+            input_records = (INPUT_RECORD * MAX_EVENTS)()
             keys: list[str] = []
-            append_key = keys.append
+            last_input = 0.0
 
             while not exit_requested():
-                for event in parser.tick():
-                    self.process_event(event)  # type: ignore[arg-type]
-
-                if wait_for_handles([hIn], 100) is None:
+                ready = wait_for_handles([hIn, wake], _wait_timeout_ms(parser))
+                if ready is None:
+                    # Timed out: only now can a lone ESC have become a key press.
+                    for event in parser.tick():
+                        self.process_event(event)  # type: ignore[arg-type]
+                    continue
+                if ready is wake:
                     continue
 
                 del keys[:]
-                new_size: tuple[int, int] | None = None
-
-                # Drain all pending input records one at a time.
-                while True:
-                    ReadConsoleInputW(hIn, byref(input_record), 1, byref(read_count))
-                    if read_count.value == 0:
-                        break
-
-                    event_type = input_record.EventType
-
-                    if event_type == KEY_EVENT:
-                        key_event = input_record.Event.KeyEvent
-                        key = key_event.uChar.UnicodeChar
-                        if key_event.bKeyDown:
-                            if key_event.dwControlKeyState and key_event.wVirtualKeyCode == 0:
-                                pass
-                            elif key == "\r":
-                                mod = _poll_modifier_param()
-                                if mod > 1:
-                                    keys.extend(f"\x1b[13;{mod}u")
-                                else:
-                                    append_key(key)
-                            else:
-                                append_key(key)
-                    elif event_type == WINDOW_BUFFER_SIZE_EVENT:
-                        size = input_record.Event.WindowBufferSizeEvent.dwSize
-                        new_size = (size.X, size.Y)
-
-                    # Check if more records are pending.
-                    pending = DWORD(0)
-                    KERNEL32.GetNumberOfConsoleInputEvents(hIn, byref(pending))
-                    if pending.value == 0:
+                now = get_time()
+                in_burst = now - last_input < _BURST_GAP
+                coalesce_until = now + _COALESCE_WINDOW
+                new_size = _drain_input(hIn, input_records, read_count, keys)
+                # Keep collecting while a burst is still arriving, so pastes reach
+                # the parser in one feed without delaying single keystrokes.
+                while in_burst and get_time() < coalesce_until:
+                    if wait_for_handles([hIn], _COALESCE_POLL_MS) is None:
                         break
+                    new_size = _drain_input(hIn, input_records, read_count, keys) or new_size
+                last_input = get_time()
 
                 if keys:
-                    for event in parser.feed(
-                        "".join(keys).encode("utf-16", "surrogatepass").decode("utf-16")
-                    ):
+                    for event in parser.feed(_join_utf16(keys)):
                         self.process_event(event)  # type: ignore[arg-type]
                 if new_size is not None:
                     self.on_size_change(*new_size)
 
         except Exception as error:
             self.app.log.error("EVENT MONITOR ERROR", error)
+        finally:
+            del exit_event.set  # restore the class method
+            _CloseHandle(wake)
 
     EventMonitor.run = _patched_run  # type: ignore[assignment]
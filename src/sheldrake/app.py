@@ -38,30 +38,7 @@ class SheldrakeApp(App):
         Binding("ctrl+o", "toggle_panel", "Backtracks"),
     ]
 
-    CSS = """
-    #main {
-        height: 1fr;
-    }
-    #chat-view {
-        overflow-y: auto;
-        height: 1fr;
-    }
-    #status {
-        dock: bottom;
-        height: 1;
-    }
-    Footer {
-        background: transparent;
-    }
-    Footer .footer-key--key {
-        background: transparent;
-        color: $text;
-        padding: 0 1;
-    }
-    Footer .footer-key--description {
-        color: $text-muted;
-    }
-    """
+    CSS_PATH = "app.tcss"
 
     def __init__(self, model: str | None = None, debug: bool = False) -> None:
         super().__init__()
@@ -71,6 +48,7 @@ class SheldrakeApp(App):
         self._processor = None
         self._current_stream: Any = None
         self._inferring = False
+        self._inflight_text: str | None = None
 
     def compose(self) -> ComposeResult:
         yield Header(show_clock=True)
@@ -84,62 +62,99 @@ class SheldrakeApp(App):
         yield Footer()
 
     _RICH_TAG_RE = re.compile(r"\[/?[a-z][a-z0-9_ ]*\]", re.IGNORECASE)
+    _RICH_TAG_SUB = _RICH_TAG_RE.sub
 
     def _log_debug(self, msg: str) -> None:
         """Write to the debug trace file."""
         if not self._show_debug:
             return
         if self._debug_file:
-            plain = self._RICH_TAG_RE.sub("", msg)
+            # Most per-token lines carry no markup — skip the regex for them.
+            plain = self._RICH_TAG_SUB("", msg) if "[" in msg else msg
             self._debug_file.write(plain + "\n")
+
+    def _flush_debug(self) -> None:
+        """Flush buffered debug trace lines to disk."""
+        if self._debug_file:
             self._debug_file.flush()
 
     def on_mount(self) -> None:
-        self.query_one("#input", ChatInput).focus()
+        # Widgets are composed once and never replaced; resolve them once here.
+        self._chat = self.query_one("#chat-view", VerticalScroll)
+        self._status = self.query_one("#status", StatusBar)
+        self._panel = self.query_one("#backtrack-panel", BacktrackPanel)
+        self._input = self.query_one("#input", ChatInput)
 
-        status = self.query_one("#status", StatusBar)
-        status.model = self.settings.model
-        status.mode = self.settings.default_mode
+        self._input.focus()
+        self._status.model = self.settings.model
+        self._status.mode = self.settings.default_mode
 
         if self._show_debug:
-            self._debug_file = open("sheldrake_debug.log", "w", encoding="utf-8")  # noqa: SIM115
+            self._debug_file = open(  # noqa: SIM115
+                "sheldrake_debug.log", "w", buffering=65536, encoding="utf-8"
+            )
             self._log_debug("[bold]Sheldrake debug trace[/bold]")
+            # Writes are buffered; flush periodically so the trace can be tailed live.
+            self.set_interval(0.5, self._flush_debug)
 
         if not os.environ.get("ANTHROPIC_API_KEY"):
-            chat = self.query_one("#chat-view", VerticalScroll)
             error_md = AssistantMessage()
-            chat.mount(error_md)
+            self._chat.mount(error_md)
             error_md.update(
                 "**Error:** `ANTHROPIC_API_KEY` environment variable is not set.\n\n"
                 "Set it and restart:\n```\nexport ANTHROPIC_API_KEY=sk-ant-...\n```"
             )
-            return
 
-        from anthropic import AsyncAnthropic
+    def _ensure_processor(self) -> Any:
+        """Build the inference pipeline on first use.
+
+        Importing anthropic pulls in httpx, pydantic models and TLS setup, so it is
+        deferred until the first message instead of delaying the first frame.
+        """
+        if self._processor is None and os.environ.get("ANTHROPIC_API_KEY"):
+            import httpx
+            from anthropic import AsyncAnthropic, DefaultAsyncHttpxClient
 
-        from sheldrake.inference import InferenceManager
-        from sheldrake.stream import StreamProcessor
+            from sheldrake.inference import InferenceManager
+            from sheldrake.stream import StreamProcessor
 
-        client = AsyncAnthropic()
-        inference = InferenceManager(client, self.settings)
-        self._processor = StreamProcessor(
-            inference, self.settings, on_debug=self._log_debug if self._show_debug else None
-        )
+            # Keep the pooled connection alive across the user's think time so the
+            # next turn and every backtrack restart skip the TCP/TLS handshake.
+            http_client = DefaultAsyncHttpxClient(
+                limits=httpx.Limits(max_keepalive_connections=8, keepalive_expiry=60.0)
+            )
+            client = AsyncAnthropic(http_client=http_client)
+            inference = InferenceManager(client, self.settings)
+            self._processor = StreamProcessor(
+                inference, self.settings, on_debug=self._log_debug if self._show_debug else None
+            )
+        return self._processor
 
-    def on_unmount(self) -> None:
+    async def on_unmount(self) -> None:
+        if self._processor is not None:
+            # Close any open stream and stop a pending prompt-prefix measurement.
+            await self._processor.inference.aclose()
         if self._debug_file:
+            self._debug_file.flush()
             self._debug_file.close()
 
     def on_chat_input_submitted(self, event: ChatInput.Submitted) -> None:
         """Handle user message submission."""
         text = event.value
+        if text == self._inflight_text:
+            # Double submit of the message already being answered: keep the input.
+            self.notify("Already sending this message.", timeout=2)
+            return
+        self._inflight_text = text
+        self._input.clear()
 
-        self.query_one("#backtrack-panel", BacktrackPanel).clear()
+        self._panel.clear()
 
-        chat = self.query_one("#chat-view", VerticalScroll)
+        chat = self._chat
         chat.mount(UserMessage(text))
 
-        if self._processor is None:
+        if self._ensure_processor() is None:
+            self._inflight_text = None
             error = AssistantMessage()
             chat.mount(error)
             error.update("**Error:** No API key configured. Set `ANTHROPIC_API_KEY` and restart.")
@@ -154,21 +169,18 @@ class SheldrakeApp(App):
     @work(exclusive=True)
     async def _run_inference(self, user_text: str, response_widget: AssistantMessage) -> None:
         """Background worker for streaming inference."""
-        chat = self.query_one("#chat-view", VerticalScroll)
-        status = self.query_one("#status", StatusBar)
+        chat = self._chat
+        status = self._status
+        panel = self._panel
         stream = Markdown.get_stream(response_widget)
         self._current_stream = stream
         chat.anchor()
 
-        async def on_text(t: str) -> None:
-            await stream.write(t)
-
         def on_backtrack(bt: Backtrack, text: str) -> None:
             response_widget.update(text)
             status.backtracks += 1
             if bt.mode:
                 status.mode = bt.mode
-            panel = self.query_one("#backtrack-panel", BacktrackPanel)
             panel.add_entry(bt.reason, bt.mode)
             panel.remove_class("-hidden")
 
@@ -184,17 +196,20 @@ class SheldrakeApp(App):
         try:
             await self._processor.run(
                 user_message=user_text,
-                on_text=on_text,
+                on_text=stream.write,
                 on_backtrack=on_backtrack,
                 on_error=on_error,
                 on_done=on_done,
             )
         finally:
+            if self._inflight_text == user_text:
+                self._inflight_text = None
             self._inferring = False
             self.refresh_bindings()
             await stream.stop()
             self._current_stream = None
             chat.scroll_end(animate=False)
+            self._flush_debug()
 
     def check_action(self, action: str, parameters: tuple[object, ...]) -> bool | None:
         """Show Esc binding only during inference."""
@@ -204,7 +219,7 @@ class SheldrakeApp(App):
 
     def action_toggle_panel(self) -> None:
         """Toggle the backtrack side panel."""
-        self.query_one("#backtrack-panel", BacktrackPanel).toggle_class("-hidden")
+        self._panel.toggle_class("-hidden")
 
     def action_cancel_inference(self) -> None:
         """Cancel the running inference worker."""
@@ -2,7 +2,7 @@
 
 from __future__ import annotations
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 DEFAULT_MODEL = "claude-opus-4-6"
 
@@ -14,12 +14,31 @@ MODES: dict[str, dict[str, float]] = {
 }
 
 
+def format_modes_summary(modes: dict[str, dict[str, float]]) -> str:
+    """Render modes as ``name (temperature)`` pairs for the system prompt."""
+    return ", ".join(f"{name} ({p['temperature']})" for name, p in modes.items())
+
+
+MODES_SUMMARY = format_modes_summary(MODES)
+
+
 class Settings(BaseModel):
-    """Runtime configuration for Sheldrake."""
+    """Runtime configuration for Sheldrake.
+
+    Frozen: consumers may read values once at construction and keep them.
+    """
+
+    model_config = ConfigDict(frozen=True)
 
     model: str = DEFAULT_MODEL
     max_backtracks: int = 8
     min_tokens_between_signals: int = 20
     default_mode: str = "balanced"
     max_hint_length: int = 200
+    # Streamed text is batched for the UI: flushed this long after the first
+    # pending delta, or immediately once this many characters are pending.
+    text_flush_interval: float = 0.016
+    text_flush_chars: int = 64
+    # Below this many tokens Anthropic ignores cache_control on the prompt prefix.
+    min_cacheable_prompt_tokens: int = 1024
     modes: dict[str, dict[str, float]] = Field(default_factory=lambda: dict(MODES))
@@ -2,15 +2,24 @@
 
 from __future__ import annotations
 
-from collections.abc import AsyncIterator
+import asyncio
+import contextlib
+from collections.abc import AsyncGenerator
 from typing import TYPE_CHECKING
 
 from sheldrake.config import Settings
+from sheldrake.system_prompt import STATIC_PROMPT_PREFIX, system_blocks
 
 if TYPE_CHECKING:
     from anthropic import AsyncAnthropic, AsyncMessageStream
 
 
+def _consume_result(task: asyncio.Task[None]) -> None:
+    """Retrieve a background task's outcome so failures are never reported as unhandled."""
+    if not task.cancelled():
+        task.exception()
+
+
 class InferenceManager:
     """Manages Anthropic API streaming with cancel/restart support."""
 
@@ -18,15 +27,28 @@ class InferenceManager:
         self.client = client
         self.settings = settings
         self._active_stream: AsyncMessageStream | None = None
+        # Token count of the static prompt prefix, measured once in the background.
+        self._static_tokens: int | None = None
+        self._count_task: asyncio.Task[None] | None = None
 
     async def stream(
         self,
         messages: list[dict],
-        system: str,
+        system: str | list[dict],
         mode: str = "balanced",
         temperature: float | None = None,
-    ) -> AsyncIterator[str]:
-        """Start streaming inference. Yields text deltas."""
+    ) -> AsyncGenerator[str, None]:
+        """Start streaming inference. Yields text deltas.
+
+        A ``str`` system prompt built from the template is sent as content blocks
+        with the static part marked for prompt caching, unless the prefix has been
+        measured below the model's cacheable minimum; lists are sent as given.
+        """
+        if self._count_task is None:
+            self._count_task = asyncio.ensure_future(self._count_static_tokens())
+            self._count_task.add_done_callback(_consume_result)
+        if isinstance(system, str) and self._static_prefix_cacheable():
+            system = system_blocks(system)
         params = self.settings.modes[mode]
         effective_temp = temperature if temperature is not None else params["temperature"]
         kwargs: dict = {
@@ -44,8 +66,33 @@ class InferenceManager:
             async for text in stream.text_stream:
                 yield text
 
+    async def _count_static_tokens(self) -> None:
+        """Measure the static prompt prefix once; failures leave caching enabled."""
+        with contextlib.suppress(Exception):
+            result = await self.client.messages.count_tokens(
+                model=self.settings.model,
+                system=STATIC_PROMPT_PREFIX,
+                messages=[{"role": "user", "content": "."}],
+            )
+            self._static_tokens = result.input_tokens
+
+    def _static_prefix_cacheable(self) -> bool:
+        """Whether marking the static prefix for caching can take effect."""
+        tokens = self._static_tokens
+        return tokens is None or tokens >= self.settings.min_cacheable_prompt_tokens
+
     async def cancel(self) -> None:
-        """Cancel active stream."""
+        """Cancel active stream.
+
+        Called on every backtrack, so a pending prefix measurement keeps running.
+        """
         if self._active_stream is not None:
             await self._active_stream.close()
             self._active_stream = None
+
+    async def aclose(self) -> None:
+        """Shut down: cancel active stream and any unfinished prefix measurement."""
+        if self._count_task is not None and not self._count_task.done():
+            self._count_task.cancel()
+            self._count_task = None
+        await self.cancel()
@@ -9,23 +9,27 @@ from __future__ import annotations
 
 import contextlib
 import enum
-
-from pydantic import BaseModel
+from dataclasses import dataclass
 
 MAX_SIGNAL_LENGTH = 500
 
 # Valid tag prefixes — the parser only enters signal mode for these
 _TAG_PREFIXES = ("checkpoint:", "backtrack:")
-_MAX_PREFIX_LEN = max(len(p) for p in _TAG_PREFIXES)
+# The prefixes differ in their first char, which alone selects the literal to match.
+_PREFIX_BY_FIRST_CHAR = {p[0]: p for p in _TAG_PREFIXES}
+_OPEN = "<<"
+_CLOSE = ">>"
 
 
-class TextChunk(BaseModel):
+@dataclass(slots=True, frozen=True)
+class TextChunk:
     """Plain text fragment from the token stream."""
 
     text: str
 
 
-class Checkpoint(BaseModel):
+@dataclass(slots=True, frozen=True)
+class Checkpoint:
     """Invisible checkpoint placed by the model."""
 
     id: str
@@ -34,7 +38,8 @@ class Checkpoint(BaseModel):
     accumulated_raw: str = ""
 
 
-class Backtrack(BaseModel):
+@dataclass(slots=True, frozen=True)
+class Backtrack:
     """Backtrack signal requesting rewind to a checkpoint."""
 
     checkpoint_id: str
@@ -62,46 +67,61 @@ def _parse_backtrack_extras(
     mode = None
     temperature = None
     for part in parts:
-        if part.startswith("rephrase:"):
-            rephrase = part[len("rephrase:") :]
-        elif part.startswith("mode:"):
-            mode = part[len("mode:") :]
-        elif part.startswith("temp:"):
+        key, sep, value = part.partition(":")
+        if not sep:
+            continue
+        if key == "rephrase":
+            rephrase = value
+        elif key == "mode":
+            mode = value
+        elif key == "temp":
             with contextlib.suppress(ValueError):
-                temperature = float(part[len("temp:") :])
+                temperature = float(value)
     return rephrase, mode, temperature
 
 
+def _parse_checkpoint(rest: str) -> Checkpoint | None:
+    """Parse the part of a checkpoint signal after 'checkpoint:'."""
+    return Checkpoint(id=rest) if rest else None
+
+
+def _parse_backtrack(rest: str) -> Backtrack | None:
+    """Parse the part of a backtrack signal after 'backtrack:'."""
+    if not rest:
+        return None
+    parts = rest.split("|")
+    if len(parts) < 2 or not parts[0] or not parts[1]:
+        return None
+    rephrase, mode, temperature = _parse_backtrack_extras(parts[2:])
+    return Backtrack(
+        checkpoint_id=parts[0],
+        reason=parts[1],
+        rephrase=rephrase,
+        mode=mode,
+        temperature=temperature,
+    )
+
+
+# Signal kind (the tag name before the first ':') → body parser.
+_SIGNAL_PARSERS = {
+    "checkpoint": _parse_checkpoint,
+    "backtrack": _parse_backtrack,
+}
+
+
 def _parse_signal_body(body: str) -> Checkpoint | Backtrack | None:
     """Parse the content between << and >> into a signal object."""
-    if body.startswith("checkpoint:"):
-        cp_id = body[len("checkpoint:") :]
-        return Checkpoint(id=cp_id) if cp_id else None
-
-    if body.startswith("backtrack:"):
-        rest = body[len("backtrack:") :]
-        if not rest:
-            return None
-        parts = rest.split("|")
-        if len(parts) < 2 or not parts[0] or not parts[1]:
-            return None
-        rephrase, mode, temperature = _parse_backtrack_extras(parts[2:])
-        return Backtrack(
-            checkpoint_id=parts[0],
-            reason=parts[1],
-            rephrase=rephrase,
-            mode=mode,
-            temperature=temperature,
-        )
-
-    return None
+    kind, sep, rest = body.partition(":")
+    parse = _SIGNAL_PARSERS.get(kind) if sep else None
+    return parse(rest) if parse is not None else None
 
 
 class SignalParser:
     """Streaming parser that separates text from protocol signals.
 
     States:
-        TEXT        — emit chars as TextChunk. On '<', go to MAYBE_OPEN.
+        TEXT        — emit chars as TextChunk. On '<<', go to TAG_CHECK. A '<' that
+                      ends the chunk goes to MAYBE_OPEN.
         MAYBE_OPEN  — if next is '<', go to TAG_CHECK. Else emit '<' + char, back to TEXT.
         TAG_CHECK   — accumulate chars after '<<'. Check if they match prefix of
                       'checkpoint:' or 'backtrack:'. If yes and prefix complete, go to
@@ -113,106 +133,162 @@ class SignalParser:
 
     def __init__(self) -> None:
         self._state = _State.TEXT
-        self._buffer = ""  # accumulates tag check / signal body chars
-        self._text_buffer = ""  # accumulates plain text for batching
+        # Fragments are collected in lists and joined once when emitted, so long
+        # text runs or slowly streamed signal bodies never recopy a growing str.
+        self._text_parts: list[str] = []  # plain text awaiting emission
+        self._tag = ""  # partial tag prefix after '<<' when a chunk ends mid-prefix
+        self._sig_parts: list[str] = []  # signal after '<<', including the tag prefix
+        self._sig_len = 0
+        self._scanners = {
+            _State.TEXT: self._scan_text,
+            _State.MAYBE_OPEN: self._scan_maybe_open,
+            _State.TAG_CHECK: self._scan_tag_check,
+            _State.IN_SIGNAL: self._scan_in_signal,
+        }
+
+    def reset(self) -> None:
+        """Discard all buffered input so the parser can be reused for a new stream."""
+        self._state = _State.TEXT
+        self._text_parts.clear()
+        self._tag = ""
+        self._sig_parts = []
+        self._sig_len = 0
 
     def feed(self, chunk: str) -> list[Token]:
-        """Feed a chunk of streamed text, returning parsed tokens."""
-        result: list[Token] = []
-        handlers = {
-            _State.TEXT: self._feed_text,
-            _State.MAYBE_OPEN: self._feed_maybe_open,
-            _State.TAG_CHECK: self._feed_tag_check,
-            _State.IN_SIGNAL: self._feed_in_signal,
-        }
+        """Feed a chunk of streamed text, returning parsed tokens.
 
-        for char in chunk:
-            handlers[self._state](char, result)
+        Each state handler consumes as much of the chunk as it can and returns
+        the new position: plain text runs and signal bodies are located with
+        ``str.find`` and sliced out whole, and a tag name after ``<<`` is matched
+        against its expected prefix in one comparison.
+        """
+        if self._state is _State.TEXT and "<" not in chunk:
+            # Common case: plain text with nothing held over from earlier chunks.
+            return [TextChunk(text=chunk)] if chunk else []
 
-        if self._text_buffer and self._state == _State.TEXT:
-            result.append(TextChunk(text=self._text_buffer))
-            self._text_buffer = ""
+        result: list[Token] = []
+        scanners = self._scanners
+        pos = 0
+        end = len(chunk)
+        while pos < end:
+            pos = scanners[self._state](chunk, pos, result)
+
+        if self._text_parts and self._state is _State.TEXT:
+            self._emit_text(result)
 
         return result
 
-    def _feed_text(self, char: str, result: list[Token]) -> None:
-        """Handle a character in TEXT state."""
-        if char == "<":
+    def _emit_text(self, result: list[Token]) -> None:
+        """Emit pending plain text as a single TextChunk."""
+        text = "".join(self._text_parts)
+        self._text_parts.clear()
+        if text:
+            result.append(TextChunk(text=text))
+
+    def _scan_text(self, chunk: str, pos: int, result: list[Token]) -> int:
+        """Consume plain text up to and including the next '<<'.
+
+        A lone '<' inside the chunk is plain text and needs no state change;
+        only a '<' at the very end of the chunk may still open a signal.
+        """
+        opening = chunk.find(_OPEN, pos)
+        if opening >= 0:
+            self._text_parts.append(chunk[pos:opening])
+            self._tag = ""
+            self._state = _State.TAG_CHECK
+            return opening + 2
+        if chunk.endswith("<"):
+            self._text_parts.append(chunk[pos:-1])
             self._state = _State.MAYBE_OPEN
         else:
-            self._text_buffer += char
+            self._text_parts.append(chunk[pos:])
+        return len(chunk)
 
-    def _feed_maybe_open(self, char: str, result: list[Token]) -> None:
-        """Handle a character in MAYBE_OPEN state."""
+    def _scan_maybe_open(self, chunk: str, pos: int, result: list[Token]) -> int:
+        """Consume the character after a single '<'."""
+        char = chunk[pos]
         if char == "<":
+            self._tag = ""
             self._state = _State.TAG_CHECK
-            self._buffer = ""
         else:
-            self._text_buffer += "<" + char
+            self._text_parts.append("<" + char)
             self._state = _State.TEXT
-
-    def _feed_tag_check(self, char: str, result: list[Token]) -> None:
-        """Handle a character in TAG_CHECK state."""
-        self._buffer += char
-        if self._could_be_tag_prefix(self._buffer):
-            if self._is_complete_tag_prefix(self._buffer):
+        return pos + 1
+
+    def _scan_tag_check(self, chunk: str, pos: int, result: list[Token]) -> int:
+        """Match the chars after '<<' against the one tag prefix they can start."""
+        tag = self._tag
+        prefix = _PREFIX_BY_FIRST_CHAR.get(tag[0] if tag else chunk[pos])
+        if prefix is None:
+            self._text_parts.append(_OPEN + chunk[pos])
+            self._state = _State.TEXT
+            return pos + 1
+        expected = prefix[len(tag) :]
+        got = chunk[pos : pos + len(expected)]
+        if expected.startswith(got):
+            if len(got) == len(expected):
+                self._sig_parts = [prefix]
+                self._sig_len = len(prefix)
                 self._state = _State.IN_SIGNAL
+            else:
+                self._tag = tag + got  # chunk ended mid-prefix
+            return pos + len(got)
+        # The first diverging char is consumed as text along with the match so far.
+        matched = 0
+        while got[matched] == expected[matched]:
+            matched += 1
+        self._text_parts.append(_OPEN + tag + got[: matched + 1])
+        self._state = _State.TEXT
+        return pos + matched + 1
+
+    def _scan_in_signal(self, chunk: str, pos: int, result: list[Token]) -> int:
+        """Consume signal body up to '>>', or until the length limit is exceeded."""
+        held = self._sig_len
+        # Never take more than one char past the length limit.
+        segment = chunk[pos : pos + MAX_SIGNAL_LENGTH + 1 - held]
+        if segment[0] == ">" and self._sig_parts[-1].endswith(">"):
+            stop = 1  # '>' held from the previous chunk pairs with this one
         else:
-            self._text_buffer += "<<" + self._buffer
-            self._buffer = ""
-            self._state = _State.TEXT
-
-    def _feed_in_signal(self, char: str, result: list[Token]) -> None:
-        """Handle a character in IN_SIGNAL state."""
-        self._buffer += char
-        if len(self._buffer) > MAX_SIGNAL_LENGTH:
-            self._text_buffer += "<<" + self._buffer
-            self._buffer = ""
-            self._state = _State.TEXT
-        elif self._buffer.endswith(">>"):
+            close = segment.find(_CLOSE)
+            stop = close + 2 if close >= 0 else -1
+        if stop >= 0 and held + stop <= MAX_SIGNAL_LENGTH:
+            self._sig_parts.append(segment[:stop])
             self._complete_signal(result)
+            return pos + stop
+        self._sig_parts.append(segment)
+        self._sig_len += len(segment)
+        if self._sig_len > MAX_SIGNAL_LENGTH:
+            self._text_parts.append(_OPEN)
+            self._text_parts.extend(self._sig_parts)
+            self._sig_parts = []
+            self._state = _State.TEXT
+        return pos + len(segment)
 
     def _complete_signal(self, result: list[Token]) -> None:
-        """Parse a complete signal body and emit tokens."""
-        body = self._buffer[:-2]
-        signal = _parse_signal_body(body)
+        """Parse a complete signal and emit tokens."""
+        raw = "".join(self._sig_parts)
+        signal = _parse_signal_body(raw[:-2])
         if signal is not None:
-            if self._text_buffer:
-                result.append(TextChunk(text=self._text_buffer))
-                self._text_buffer = ""
+            if self._text_parts:
+                self._emit_text(result)
             result.append(signal)
         else:
-            self._text_buffer += "<<" + self._buffer
-        self._buffer = ""
+            self._text_parts.append(_OPEN + raw)
+        self._sig_parts = []
         self._state = _State.TEXT
 
     def flush(self) -> list[TextChunk]:
         """Emit any buffered incomplete content as text."""
-        result: list[TextChunk] = []
-
-        pending = self._text_buffer
+        pending = self._text_parts
         match self._state:
             case _State.MAYBE_OPEN:
-                pending += "<"
+                pending.append("<")
             case _State.TAG_CHECK:
-                pending += "<<" + self._buffer
+                pending.append(_OPEN + self._tag)
             case _State.IN_SIGNAL:
-                pending += "<<" + self._buffer
-
-        self._text_buffer = ""
-        self._buffer = ""
-        self._state = _State.TEXT
-
-        if pending:
-            result.append(TextChunk(text=pending))
-        return result
-
-    @staticmethod
-    def _could_be_tag_prefix(s: str) -> bool:
-        """Check if s could be the start of a valid tag name."""
-        return any(prefix.startswith(s) for prefix in _TAG_PREFIXES)
+                pending.append(_OPEN)
+                pending.extend(self._sig_parts)
 
-    @staticmethod
-    def _is_complete_tag_prefix(s: str) -> bool:
-        """Check if s matches a complete tag prefix (e.g., 'checkpoint:' or 'backtrack:')."""
-        return any(s == prefix for prefix in _TAG_PREFIXES)
+        text = "".join(pending)
+        self.reset()
+        return [TextChunk(text=text)] if text else []
@@ -2,9 +2,11 @@
 
 from __future__ import annotations
 
+import asyncio
+import contextlib
 import inspect
-from collections.abc import AsyncIterator, Callable
-from dataclasses import dataclass, field
+from collections.abc import AsyncGenerator, Awaitable, Callable
+from dataclasses import dataclass, field, replace
 from typing import TYPE_CHECKING, Protocol, runtime_checkable
 
 from sheldrake.protocol import Backtrack, Checkpoint, SignalParser, TextChunk
@@ -13,6 +15,12 @@ from sheldrake.system_prompt import build_system_prompt
 if TYPE_CHECKING:
     from sheldrake.config import Settings
 
+_CONTINUATION_PROMPT = (
+    "Continue your response directly from where you left off. "
+    "Do not repeat, summarize, or acknowledge this instruction. "
+    "Pick up mid-sentence if needed."
+)
+
 
 @runtime_checkable
 class InferenceLike(Protocol):
@@ -21,41 +29,272 @@ class InferenceLike(Protocol):
     def stream(
         self,
         messages: list[dict],
-        system: str,
+        system: str | list[dict],
         mode: str = "balanced",
         temperature: float | None = None,
-    ) -> AsyncIterator[str]: ...
+    ) -> AsyncGenerator[str, None]: ...
 
     async def cancel(self) -> None: ...
 
+    async def aclose(self) -> None: ...
+
 
 class _BacktrackSignal(Exception):
     """Internal signal to break out of stream loop for retry."""
 
 
-async def _maybe_await(result: object) -> None:
-    """Await the result if it's a coroutine, otherwise no-op."""
-    if inspect.isawaitable(result):
-        await result
+# Queued by the producer after the last delta of an inference stream.
+_END_OF_STREAM = object()
+
+# Deltas the producer may read ahead while the consumer is busy with callbacks.
+_DELTA_QUEUE_SIZE = 64
+
+# Shown and kept in the reply in place of a retry that already ran in this run.
+_REPEATED_BACKTRACK_MARKER = " [repeated backtrack ignored] "
+
+
+def _as_async(callback: Callable) -> Callable[..., Awaitable[None]]:
+    """Resolve a sync or async callback once into an always-awaitable callable.
+
+    Callables that are not coroutine functions but still return an awaitable (a
+    lambda or ``functools.partial`` around one, an async ``__call__``) are awaited.
+    """
+    if inspect.iscoroutinefunction(callback):
+        return callback
+
+    async def call(*args: object) -> None:
+        result = callback(*args)
+        if inspect.isawaitable(result):
+            await result
+
+    return call
+
+
+class _TextCoalescer:
+    """Batch streamed text deltas into fewer on_text calls.
 
+    API deltas are often only a few characters long. Instead of awaiting the
+    display callback per delta, text is collected and emitted by a background
+    task ``interval`` seconds after the first pending delta, or as soon as
+    ``max_chars`` are pending. Callbacks that must observe the text in order
+    (backtrack, done) are wrapped with ``flushing``. An exception from a
+    background flush is re-raised by the next ``write`` or ``flush``.
+    """
 
-@dataclass
+    __slots__ = (
+        "_error",
+        "_interval",
+        "_max_chars",
+        "_on_text",
+        "_pending",
+        "_pending_chars",
+        "_task",
+        "_timer",
+    )
+
+    def __init__(
+        self, on_text: Callable[[str], Awaitable[None]], interval: float, max_chars: int
+    ) -> None:
+        self._on_text = on_text
+        self._interval = interval
+        self._max_chars = max_chars
+        self._pending: list[str] = []
+        self._pending_chars = 0
+        self._timer: asyncio.TimerHandle | None = None
+        self._task: asyncio.Task[None] | None = None
+        self._error: BaseException | None = None
+
+    async def write(self, text: str) -> None:
+        """Queue text for the next flush."""
+        self._raise_error()
+        self._pending.append(text)
+        self._pending_chars += len(text)
+        if self._task is not None:
+            return  # the running drain picks this up
+        if self._pending_chars >= self._max_chars:
+            if self._timer is not None:
+                self._timer.cancel()
+            self._start()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self._interval, self._start)
+
+    def _start(self) -> None:
+        self._timer = None
+        self._task = asyncio.ensure_future(self._drain())
+        self._task.add_done_callback(self._drained)
+
+    def _drained(self, task: asyncio.Task[None]) -> None:
+        """Keep a background flush's exception for the run to re-raise."""
+        if not task.cancelled() and (exc := task.exception()) is not None:
+            self._error = exc
+
+    def _raise_error(self) -> None:
+        if (exc := self._error) is not None:
+            self._error = None
+            raise exc
+
+    async def _drain(self) -> None:
+        try:
+            # Text written while on_text is awaited is picked up by the next pass.
+            while self._pending:
+                text = _joined(self._pending)
+                self._pending.clear()
+                self._pending_chars = 0
+                await self._on_text(text)
+        finally:
+            self._task = None
+
+    async def flush(self) -> None:
+        """Emit all pending text before returning."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._task is not None:
+            await asyncio.wait([self._task])
+        self._raise_error()
+        if self._pending:
+            self._task = asyncio.current_task()
+            await self._drain()
+
+    def close(self) -> None:
+        """Drop pending text and stop any scheduled or running flush."""
+        self._pending.clear()
+        self._pending_chars = 0
+        self._error = None
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._task is not None and self._task is not asyncio.current_task():
+            self._task.cancel()
+        self._task = None
+
+    def flushing(self, callback: Callable[..., Awaitable[None]]) -> Callable[..., Awaitable[None]]:
+        """Wrap a callback so pending text is emitted before it runs."""
+
+        async def call(*args: object) -> None:
+            await self.flush()
+            await callback(*args)
+
+        return call
+
+    def dropping(self, callback: Callable[..., Awaitable[None]]) -> Callable[..., Awaitable[None]]:
+        """Wrap a callback so pending text is discarded before it runs."""
+
+        async def call(*args: object) -> None:
+            self.close()
+            await callback(*args)
+
+        return call
+
+
+async def _next_batch(
+    deltas: asyncio.Queue[object],
+) -> tuple[str, BaseException | object | None]:
+    """Await the next delta and take every further delta already queued with it.
+
+    Returns the joined text and the item that ended the batch if it is the end
+    sentinel or an exception, else ``None``. Deltas that piled up while tokens
+    were being handled are parsed in one ``feed`` call.
+    """
+    item = await deltas.get()
+    parts: list[str] = []
+    while isinstance(item, str):
+        parts.append(item)
+        if deltas.empty():
+            return "".join(parts), None
+        item = deltas.get_nowait()
+    return "".join(parts), item
+
+
+def _describe_backtrack(bt: Backtrack) -> str:
+    """Format an accepted backtrack for the debug trace."""
+    return (
+        f"[bold magenta]BACKTRACK:[/bold magenta] "
+        f"→ {bt.checkpoint_id} | {bt.reason}"
+        + (f" | mode:{bt.mode}" if bt.mode else "")
+        + (f" | rephrase:{bt.rephrase}" if bt.rephrase else "")
+        + (f" | temp:{bt.temperature}" if bt.temperature is not None else "")
+    )
+
+
+def _joined(parts: list[str]) -> str:
+    """Join text fragments, collapsing the list to the result so repeat reads are free."""
+    if len(parts) == 1:
+        return parts[0]
+    text = "".join(parts)
+    parts[:] = [text]
+    return text
+
+
+@dataclass(slots=True)
 class _RunCtx:
-    """Mutable state for a single run() invocation."""
+    """Mutable state for a single run() invocation.
+
+    Response text is held as fragment lists and joined lazily: per-token appends
+    stay O(1) instead of recopying an ever-growing string.
+    """
 
-    accumulated: str = ""
-    accumulated_raw: str = ""
+    text_parts: list[str] = field(default_factory=list)
+    raw_parts: list[str] = field(default_factory=list)
     checkpoints: dict[str, Checkpoint] = field(default_factory=dict)
     chars_since: int = 0
     hints: list[str] = field(default_factory=list)
+    # Rewind target and retry parameters of every accepted backtrack in this run.
+    tried: set[tuple] = field(default_factory=set)
     bt_count: int = 0
     mode: str = "balanced"
     temperature: float | None = None
 
+    @property
+    def accumulated(self) -> str:
+        """Clean response text so far."""
+        return _joined(self.text_parts)
+
+    @property
+    def accumulated_raw(self) -> str:
+        """Response text so far, including accepted checkpoint tags."""
+        return _joined(self.raw_parts)
+
+    def append(self, text: str) -> None:
+        """Append streamed text to both the clean and raw transcripts."""
+        self.text_parts.append(text)
+        self.raw_parts.append(text)
+
+    def first_try(self, cp: Checkpoint, bt: Backtrack) -> bool:
+        """Record a backtrack's retry; False if the same retry already ran in this run.
+
+        On False the backtrack is not performed: the rejected text stays, followed
+        by ``_REPEATED_BACKTRACK_MARKER``, and both are committed to the processor's
+        ``messages`` as part of the assistant reply.
+        """
+        temperature = bt.temperature if bt.temperature is not None else self.temperature
+        key = (cp.accumulated_text, bt.reason, bt.rephrase, bt.mode or self.mode, temperature)
+        if key in self.tried:
+            return False
+        self.tried.add(key)
+        return True
+
+    def rewind(self, cp: Checkpoint) -> None:
+        """Truncate both transcripts back to a checkpoint."""
+        self.text_parts[:] = [cp.accumulated_text]
+        self.raw_parts[:] = [cp.accumulated_raw]
+
 
 class StreamProcessor:
     """Orchestrates inference with backtrack interception."""
 
+    __slots__ = (
+        "_active_run",
+        "_debug",
+        "_dispatch",
+        "_max_bt",
+        "_min_gap",
+        "_system_cache",
+        "inference",
+        "messages",
+        "settings",
+    )
+
     def __init__(
         self,
         inference: InferenceLike,
@@ -64,11 +303,25 @@ class StreamProcessor:
     ) -> None:
         self.inference = inference
         self.settings = settings
+        # Settings are frozen; limits checked per signal are read once here.
+        self._min_gap = settings.min_tokens_between_signals
+        self._max_bt = settings.max_backtracks
         self.messages: list[dict] = []
         self._debug = on_debug
+        self._system_cache: tuple[tuple, str] | None = None
+        self._active_run: asyncio.Task | None = None
+        # Per-token dispatch keyed on exact token type (cheaper than match/case).
+        self._dispatch: dict[type, Callable[..., Awaitable[None]]] = {
+            TextChunk: self._handle_text,
+            Checkpoint: self._handle_checkpoint_token,
+            Backtrack: self._handle_backtrack,
+        }
 
     def _dbg(self, msg: str) -> None:
-        """Emit a debug message if debug callback is set."""
+        """Emit a debug message if debug callback is set.
+
+        Only for rare events; hot paths check ``self._debug`` before formatting.
+        """
         if self._debug:
             self._debug(msg)
 
@@ -82,35 +335,94 @@ class StreamProcessor:
     ) -> None:
         """Process a user message with backtracking support.
 
-        Callbacks may be sync or async — async results are awaited.
+        Callbacks may be plain functions or ``async def`` — resolved once per run.
+        Text is coalesced before reaching ``on_text``; it is always fully delivered
+        before ``on_backtrack`` and ``on_done`` are called.
         """
+        text_out = _TextCoalescer(
+            _as_async(on_text),
+            self.settings.text_flush_interval,
+            self.settings.text_flush_chars,
+        )
+        on_text = text_out.write
+        on_backtrack = text_out.flushing(_as_async(on_backtrack))
+        on_error = text_out.dropping(_as_async(on_error))
+        on_done = text_out.flushing(_as_async(on_done))
         self.messages.append({"role": "user", "content": user_message})
         ctx = _RunCtx(
             mode=self.settings.default_mode,
-            chars_since=self.settings.min_tokens_between_signals,
+            chars_since=self._min_gap,
         )
         self._dbg(f"[dim]user:[/dim] {user_message!r}")
         self._dbg(f"[dim]start:[/dim] mode={ctx.mode}")
 
         try:
-            parser = await self._inference_loop(ctx, on_text, on_backtrack, on_error)
+            parser = await self._run_attempts(ctx, on_text, on_backtrack, on_error)
             if parser is None:
                 return
 
-            for token in parser.flush():
-                if isinstance(token, TextChunk):
-                    ctx.accumulated += token.text
-                    self._dbg(f"[dim cyan]text:[/dim cyan] {token.text!r}")
-                    await _maybe_await(on_text(token.text))
+            try:
+                for token in parser.flush():
+                    if isinstance(token, TextChunk):
+                        ctx.text_parts.append(token.text)
+                        if self._debug:
+                            self._debug(f"[dim cyan]text:[/dim cyan] {token.text!r}")
+                        await on_text(token.text)
+                # Deliver all text before committing, so a display failure is an error.
+                await text_out.flush()
+            except Exception as exc:
+                await self._report_error(exc, on_error)
+                return
 
             self.messages.append({"role": "assistant", "content": ctx.accumulated})
             self._dbg(f"[dim]done:[/dim] {len(ctx.accumulated)} chars, {ctx.bt_count} backtracks")
-            await _maybe_await(on_done(ctx.accumulated))
+            await on_done(ctx.accumulated)
         finally:
             # Roll back user message if no assistant reply was committed (error,
             # cancellation, or any other non-success exit path).
             if self.messages and self.messages[-1]["role"] == "user":
                 self.messages.pop()
+            text_out.close()
+
+    async def _run_attempts(
+        self,
+        ctx: _RunCtx,
+        on_text: Callable,
+        on_backtrack: Callable,
+        on_error: Callable,
+    ) -> SignalParser | None:
+        """Run the attempt loop in its own task, so aclose() can stop it alone.
+
+        Returns None if the loop failed or was stopped by aclose(); cancelling the
+        caller still cancels the loop and propagates as usual.
+        """
+        attempts = asyncio.ensure_future(self._inference_loop(ctx, on_text, on_backtrack, on_error))
+        self._active_run = attempts
+        try:
+            return await attempts
+        except asyncio.CancelledError:
+            caller = asyncio.current_task()
+            if not attempts.cancelled() or (caller is not None and caller.cancelling()):
+                raise
+            self._dbg("[dim]stopped:[/dim] run closed")
+            return None
+        finally:
+            self._active_run = None
+
+    async def aclose(self) -> None:
+        """Stop the run in progress, if any, and wait until it has stopped.
+
+        Only the processor's own attempt task is cancelled: the task awaiting
+        ``run()`` gets a normal return (without ``on_done``) and keeps running.
+        """
+        task = self._active_run
+        if task is None:
+            return
+        task.cancel()
+        if task is asyncio.current_task():
+            return  # called from a callback; the loop stops at its next await
+        await asyncio.wait([task])
+        await self.inference.cancel()
 
     async def _inference_loop(
         self,
@@ -120,81 +432,149 @@ class StreamProcessor:
         on_error: Callable,
     ) -> SignalParser | None:
         """Run inference with backtrack retries. Return final parser or None on error."""
+        parser = SignalParser()
         while True:
             api_messages = self._build_messages(ctx.accumulated)
             effective_temp = ctx.temperature
             if effective_temp is None:
                 effective_temp = self.settings.modes[ctx.mode]["temperature"]
-            system = build_system_prompt(
-                ctx.hints,
-                self.settings.max_hint_length,
-                mode=ctx.mode,
-                temperature=effective_temp,
-                modes=self.settings.modes,
-            )
+            system = self._system_prompt(ctx, effective_temp)
 
             if ctx.hints:
                 self._dbg(
                     f"[dim]retry:[/dim] mode={ctx.mode}, temp={effective_temp}, hints={ctx.hints}"
                 )
 
-            parser = SignalParser()
+            parser.reset()  # drop any partial signal left by an abandoned attempt
+            # The network read runs on its own task so further deltas can arrive
+            # while callbacks for earlier ones are still being awaited.
+            deltas: asyncio.Queue[object] = asyncio.Queue(maxsize=_DELTA_QUEUE_SIZE)
+            producer = asyncio.create_task(
+                self._produce(deltas, api_messages, system, ctx.mode, ctx.temperature)
+            )
             try:
-                async for delta in self.inference.stream(
-                    api_messages, system, ctx.mode, temperature=ctx.temperature
-                ):
-                    for token in parser.feed(delta):
-                        await self._process_token(token, ctx, on_text, on_backtrack)
-
+                await self._consume(deltas, parser, ctx, on_text, on_backtrack)
             except _BacktrackSignal:
                 continue
             except Exception as exc:
-                self._dbg(f"[bold red]error:[/bold red] {exc}")
-                await _maybe_await(on_error(f"Inference error: {exc}"))
+                await self._report_error(exc, on_error)
                 return None
             else:
                 return parser
+            finally:
+                # Stop the producer and let its stream close before any restart.
+                producer.cancel()
+                await asyncio.wait([producer])
+
+    async def _consume(
+        self,
+        deltas: asyncio.Queue[object],
+        parser: SignalParser,
+        ctx: _RunCtx,
+        on_text: Callable,
+        on_backtrack: Callable,
+    ) -> None:
+        """Parse queued deltas and handle their tokens until the stream ends."""
+        # Bound once: the loop runs per delta batch and per token.
+        feed = parser.feed
+        dispatch = self._dispatch
+        while True:
+            text, end = await _next_batch(deltas)
+            for token in feed(text):
+                await dispatch[type(token)](token, ctx, on_text, on_backtrack)
+            if isinstance(end, BaseException):
+                raise end
+            if end is _END_OF_STREAM:
+                return
+
+    async def _report_error(self, exc: Exception, on_error: Callable) -> None:
+        """Log a failed run and hand it to the error callback."""
+        self._dbg(f"[bold red]error:[/bold red] {exc}")
+        await on_error(f"Inference error: {exc}")
+
+    async def _produce(
+        self,
+        deltas: asyncio.Queue[object],
+        messages: list[dict],
+        system: str,
+        mode: str,
+        temperature: float | None,
+    ) -> None:
+        """Read inference deltas into the queue, ending with a sentinel or the error."""
+        # aclosing: a cancel while blocked on a full queue still closes the stream now,
+        # not whenever the abandoned generator happens to be garbage-collected.
+        stream = self.inference.stream(messages, system, mode, temperature=temperature)
+        try:
+            async with contextlib.aclosing(stream):
+                async for delta in stream:
+                    await deltas.put(delta)
+        except BaseException as exc:
+            task = asyncio.current_task()
+            if task is not None and task.cancelling():
+                raise  # stopped by the consumer, nobody is reading anymore
+            await deltas.put(exc)
+        else:
+            await deltas.put(_END_OF_STREAM)
+
+    def _system_prompt(self, ctx: _RunCtx, temperature: float) -> str:
+        """Return the system prompt for this attempt, reusing the last one if unchanged."""
+        key = (tuple(ctx.hints), ctx.mode, temperature)
+        if self._system_cache is None or self._system_cache[0] != key:
+            system = build_system_prompt(
+                ctx.hints,
+                self.settings.max_hint_length,
+                mode=ctx.mode,
+                temperature=temperature,
+                modes=self.settings.modes,
+            )
+            self._system_cache = (key, system)
+        return self._system_cache[1]
+
+    async def _handle_text(
+        self, token: TextChunk, ctx: _RunCtx, on_text: Callable, on_backtrack: Callable
+    ) -> None:
+        """Append streamed text and forward it to the display callback."""
+        t = token.text
+        ctx.append(t)
+        ctx.chars_since += len(t)
+        if self._debug:
+            self._debug(f"[dim cyan]text:[/dim cyan] {t!r}")
+        await on_text(t)
 
-    async def _process_token(
-        self, token: object, ctx: _RunCtx, on_text: Callable, on_backtrack: Callable
+    async def _handle_checkpoint_token(
+        self, cp: Checkpoint, ctx: _RunCtx, on_text: Callable, on_backtrack: Callable
     ) -> None:
-        """Dispatch a parsed token to the appropriate handler."""
-        match token:
-            case TextChunk(text=t):
-                ctx.accumulated += t
-                ctx.accumulated_raw += t
-                ctx.chars_since += len(t)
-                self._dbg(f"[dim cyan]text:[/dim cyan] {t!r}")
-                await _maybe_await(on_text(t))
-            case Checkpoint() as cp:
-                self._handle_checkpoint(cp, ctx)
-            case Backtrack() as bt:
-                await self._handle_backtrack(bt, ctx, on_text, on_backtrack)
+        """Adapt _handle_checkpoint to the uniform dispatch signature."""
+        self._handle_checkpoint(cp, ctx)
 
     def _handle_checkpoint(self, cp: Checkpoint, ctx: _RunCtx) -> None:
         """Register a checkpoint if enough tokens have elapsed since last signal."""
-        if ctx.chars_since < self.settings.min_tokens_between_signals:
+        if ctx.chars_since < self._min_gap:
             self._dbg(f"[yellow]checkpoint ignored (too soon):[/yellow] {cp.id}")
             return
-        cp.position = len(ctx.accumulated)
-        cp.accumulated_text = ctx.accumulated
-        ctx.accumulated_raw += f"<<checkpoint:{cp.id}>>"
-        cp.accumulated_raw = ctx.accumulated_raw
+        text = ctx.accumulated
+        ctx.raw_parts.append(f"<<checkpoint:{cp.id}>>")
+        cp = replace(
+            cp, position=len(text), accumulated_text=text, accumulated_raw=ctx.accumulated_raw
+        )
+        # Re-insert so dict order stays sorted by position (pruning relies on it).
+        ctx.checkpoints.pop(cp.id, None)
         ctx.checkpoints[cp.id] = cp
         ctx.chars_since = 0
-        self._dbg(
-            f"[green]checkpoint:[/green] {cp.id} (pos={cp.position}, total={len(ctx.checkpoints)})"
-        )
+        if self._debug:
+            self._debug(
+                f"[green]checkpoint:[/green] {cp.id} "
+                f"(pos={cp.position}, total={len(ctx.checkpoints)})"
+            )
 
     async def _handle_backtrack(
         self, bt: Backtrack, ctx: _RunCtx, on_text: Callable, on_backtrack: Callable
     ) -> None:
         """Execute a backtrack: validate, rewind state, and raise to restart."""
-        if ctx.bt_count >= self.settings.max_backtracks:
+        if ctx.bt_count >= self._max_bt:
             self._dbg("[red]backtrack budget exhausted[/red]")
-            await _maybe_await(on_text(" [backtrack budget exhausted] "))
-            ctx.accumulated += " [backtrack budget exhausted] "
-            ctx.accumulated_raw += " [backtrack budget exhausted] "
+            await on_text(" [backtrack budget exhausted] ")
+            ctx.append(" [backtrack budget exhausted] ")
             return
 
         if bt.checkpoint_id not in ctx.checkpoints:
@@ -203,32 +583,41 @@ class StreamProcessor:
 
         if bt.mode and bt.mode not in self.settings.modes:
             self._dbg(f"[yellow]unknown mode {bt.mode!r},[/yellow] keeping {ctx.mode}")
-            bt.mode = None
+            bt = replace(bt, mode=None)
 
         if bt.temperature is not None and not (0.0 <= bt.temperature <= 1.0):
             self._dbg(f"[yellow]temp {bt.temperature} out of range [0.0, 1.0],[/yellow] discarding")
-            bt.temperature = None
-
-        self._dbg(
-            f"[bold magenta]BACKTRACK:[/bold magenta] "
-            f"→ {bt.checkpoint_id} | {bt.reason}"
-            + (f" | mode:{bt.mode}" if bt.mode else "")
-            + (f" | rephrase:{bt.rephrase}" if bt.rephrase else "")
-            + (f" | temp:{bt.temperature}" if bt.temperature is not None else "")
-        )
+            bt = replace(bt, temperature=None)
 
-        await self.inference.cancel()
         cp = ctx.checkpoints[bt.checkpoint_id]
-        ctx.accumulated = cp.accumulated_text
-        ctx.accumulated_raw = cp.accumulated_raw
-        ctx.checkpoints = {k: v for k, v in ctx.checkpoints.items() if v.position <= cp.position}
+        if not ctx.first_try(cp, bt):
+            # That exact retry already ran and led back here: keep the current text,
+            # but say so and charge the budget so a looping model still runs out.
+            self._dbg(f"[red]backtrack repeated:[/red] already tried {bt.checkpoint_id!r}")
+            ctx.bt_count += 1
+            await on_text(_REPEATED_BACKTRACK_MARKER)
+            ctx.append(_REPEATED_BACKTRACK_MARKER)
+            return
+
+        if self._debug:
+            self._debug(_describe_backtrack(bt))
+
+        await self.inference.cancel()
+        ctx.rewind(cp)
+        # Checkpoints are inserted in position order: drop stale ones from the end.
+        checkpoints = ctx.checkpoints
+        while checkpoints:
+            cp_id, last = checkpoints.popitem()
+            if last.position <= cp.position:
+                checkpoints[cp_id] = last
+                break
         ctx.hints.append(bt.reason)
         ctx.mode = bt.mode or ctx.mode
         if bt.temperature is not None:
             ctx.temperature = bt.temperature
         ctx.bt_count += 1
-        ctx.chars_since = self.settings.min_tokens_between_signals
-        await _maybe_await(on_backtrack(bt, ctx.accumulated))
+        ctx.chars_since = self._min_gap
+        await on_backtrack(bt, ctx.accumulated)
         raise _BacktrackSignal
 
     def _build_messages(self, accumulated_text: str) -> list[dict]:
@@ -236,18 +625,12 @@ class StreamProcessor:
 
         Instead of assistant prefill (not supported by all models), preserves
         good text as a prior assistant turn and adds a user continuation prompt.
+        Without accumulated text the committed history is returned as-is, not copied.
         """
-        msgs = list(self.messages)
-        if accumulated_text.strip():
-            msgs.append({"role": "assistant", "content": accumulated_text})
-            msgs.append(
-                {
-                    "role": "user",
-                    "content": (
-                        "Continue your response directly from where you left off. "
-                        "Do not repeat, summarize, or acknowledge this instruction. "
-                        "Pick up mid-sentence if needed."
-                    ),
-                }
-            )
-        return msgs
+        if not accumulated_text.strip():
+            return self.messages
+        return [
+            *self.messages,
+            {"role": "assistant", "content": accumulated_text},
+            {"role": "user", "content": _CONTINUATION_PROMPT},
+        ]
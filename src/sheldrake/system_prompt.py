@@ -2,6 +2,11 @@
 
 from __future__ import annotations
 
+import re
+from functools import lru_cache
+
+from sheldrake.config import MODES_SUMMARY, format_modes_summary
+
 SYSTEM_PROMPT_TEMPLATE = """\
 You think in drafts. Your first formulation of any idea is an exploration, not a \
 commitment. You have the ability to rewind mid-generation to an earlier point \
@@ -166,25 +171,97 @@ repeating the same mistake
 {backtrack_hints}"""
 
 
+# Runs of ASCII control characters — removed in one C-level regex pass.
+_CONTROL_CHARS_RE = re.compile(r"[\x00-\x1f\x7f]+")
+
+# The template has a single substitution site at its end; split once at import
+# so prompt assembly is a join instead of a scan over the whole template.
+STATIC_PROMPT_PREFIX, _PROMPT_SUFFIX = SYSTEM_PROMPT_TEMPLATE.split("{backtrack_hints}", 1)
+
+_HINTS_HEADER = (
+    "\n\n## Constraints for This Attempt\n"
+    "Your prior draft was rejected for the issues below. "
+    "Avoid them silently — write content directly without "
+    "discussing, acknowledging, or narrating around these constraints:\n"
+)
+
+
+@lru_cache(maxsize=128)
 def sanitize_hint(hint: str, max_length: int = 200) -> str:
-    """Bound length, strip control chars, ensure hint is inert context."""
-    cleaned = "".join(c for c in hint if c.isprintable() or c == " ")
-    return cleaned[:max_length]
+    """Bound length, strip control chars, ensure hint is inert context.
 
+    Hints accumulate across retries and are re-rendered on every attempt, so
+    results are cached.
+    """
+    if not hint.isprintable():
+        hint = _CONTROL_CHARS_RE.sub("", hint)
+        if not hint.isprintable():  # non-ASCII separators / format chars remain
+            hint = "".join(c for c in hint if c.isprintable())
+    return hint[:max_length]
 
-def _format_generation_state(
-    mode: str, temperature: float, modes: dict[str, dict[str, float]]
-) -> str:
+
+# Last custom modes dict seen and its rendered summary (Settings.modes is a copy
+# of MODES, so it is usually the same dict on every call).
+_modes_summary_memo: tuple[dict[str, dict[str, float]], str] | None = None
+
+
+def _modes_summary(modes: dict[str, dict[str, float]]) -> str:
+    """Return the rendered modes list, memoized on the identity of ``modes``."""
+    global _modes_summary_memo
+    if _modes_summary_memo is None or _modes_summary_memo[0] is not modes:
+        _modes_summary_memo = (modes, format_modes_summary(modes))
+    return _modes_summary_memo[1]
+
+
+def _format_generation_state(mode: str, temperature: float, modes_summary: str) -> str:
     """Render the current generation state section."""
-    modes_list = ", ".join(f"{name} ({p['temperature']})" for name, p in modes.items())
     return (
         f"\n\n## Current Generation State\n"
         f"Temperature: {temperature} ({mode})\n"
-        f"Available modes: {modes_list}\n"
+        f"Available modes: {modes_summary}\n"
         f"You can set temperature directly with temp:X (0.0-1.0) in a backtrack signal."
     )
 
 
+# The prefix never changes, so it is sent as its own block marked for prompt
+# caching; only the generation state and hints after it vary between requests.
+_STATIC_BLOCK = {
+    "type": "text",
+    "text": STATIC_PROMPT_PREFIX,
+    "cache_control": {"type": "ephemeral"},
+}
+
+
+def system_blocks(prompt: str) -> str | list[dict]:
+    """Split a built prompt into a cacheable static block and a dynamic block.
+
+    Prompts not built from the template are returned unchanged.
+    """
+    if not prompt.startswith(STATIC_PROMPT_PREFIX):
+        return prompt
+    return [_STATIC_BLOCK, {"type": "text", "text": prompt[len(STATIC_PROMPT_PREFIX) :]}]
+
+
+def build_system_prompt_parts(
+    hints: list[str],
+    max_length: int = 200,
+    mode: str = "balanced",
+    temperature: float = 0.6,
+    modes: dict[str, dict[str, float]] | None = None,
+) -> tuple[str, str]:
+    """Build the prompt as ``(static, dynamic)``: the constant template prefix and the tail.
+
+    Only the short tail (generation state, hints) is rendered per call.
+    """
+    summary = MODES_SUMMARY if modes is None else _modes_summary(modes)
+    parts = [_format_generation_state(mode, temperature, summary)]
+    if hints:
+        parts.append(_HINTS_HEADER)
+        parts.extend(f"- Avoid: {sanitize_hint(hint, max_length)}\n" for hint in hints)
+    parts.append(_PROMPT_SUFFIX)
+    return STATIC_PROMPT_PREFIX, "".join(parts)
+
+
 def build_system_prompt(
     hints: list[str],
     max_length: int = 200,
@@ -193,20 +270,5 @@ def build_system_prompt(
     modes: dict[str, dict[str, float]] | None = None,
 ) -> str:
     """Build the system prompt with generation state and optional backtrack context."""
-    from sheldrake.config import MODES
-
-    effective_modes = modes if modes is not None else MODES
-    state = _format_generation_state(mode, temperature, effective_modes)
-
-    hint_text = ""
-    if hints:
-        hint_text = (
-            "\n\n## Constraints for This Attempt\n"
-            "Your prior draft was rejected for the issues below. "
-            "Avoid them silently — write content directly without "
-            "discussing, acknowledging, or narrating around these constraints:\n"
-        )
-        for hint in hints:
-            hint_text += f"- Avoid: {sanitize_hint(hint, max_length)}\n"
-
-    return SYSTEM_PROMPT_TEMPLATE.replace("{backtrack_hints}", state + hint_text)
+    static, dynamic = build_system_prompt_parts(hints, max_length, mode, temperature, modes)
+    return static + dynamic
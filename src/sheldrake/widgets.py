@@ -112,12 +112,25 @@ class StatusBar(Static):
     mode: reactive[str] = reactive("balanced")
     model: reactive[str] = reactive("")
 
+    def __init__(self, **kwargs) -> None:
+        super().__init__(**kwargs)
+        # Model and mode rarely change; cache their rendering so refreshes during
+        # streaming only format the backtrack count.
+        self._cache_prefix()
+
+    def _cache_prefix(self) -> None:
+        self._prefix = f"model: {self.model} │ mode: {self.mode}"
+
+    def watch_model(self) -> None:
+        self._cache_prefix()
+
+    def watch_mode(self) -> None:
+        self._cache_prefix()
+
     def render(self) -> str:
-        parts = [f"model: {self.model}"]
-        parts.append(f"mode: {self.mode}")
-        if self.backtracks > 0:
-            parts.append(f"backtracks: {self.backtracks}")
-        return " │ ".join(parts)
+        if self.backtracks == 0:
+            return self._prefix
+        return f"{self._prefix} │ backtracks: {self.backtracks}"
 
 
 class ChatInput(TextArea):
@@ -153,11 +166,10 @@ class ChatInput(TextArea):
         super().__init__(**kwargs)
 
     def action_submit(self) -> None:
-        """Submit input text if non-empty."""
+        """Submit input text if non-empty; the handler clears it once accepted."""
         text = self.text.strip()
         if text:
             self.post_message(self.Submitted(text))
-            self.clear()
 
     def action_newline(self) -> None:
         """Insert a newline character."""
@@ -2,12 +2,14 @@
 
 from __future__ import annotations
 
+import asyncio
 from unittest.mock import AsyncMock, MagicMock
 
 import pytest
 
 from sheldrake.config import Settings
 from sheldrake.inference import InferenceManager
+from sheldrake.system_prompt import build_system_prompt
 
 
 @pytest.fixture
@@ -35,7 +37,6 @@ def test_mode_parameters_balanced(settings):
     assert settings.modes["balanced"]["temperature"] == 0.6
 
 
-@pytest.mark.asyncio
 async def test_cancel_awaits_close(settings, mock_client):
     """cancel() should await close() on the active stream."""
     manager = InferenceManager(mock_client, settings)
@@ -48,14 +49,12 @@ async def test_cancel_awaits_close(settings, mock_client):
     assert manager._active_stream is None
 
 
-@pytest.mark.asyncio
 async def test_cancel_noop_when_no_stream(settings, mock_client):
     """cancel() should be safe to call with no active stream."""
     manager = InferenceManager(mock_client, settings)
     await manager.cancel()  # should not raise
 
 
-@pytest.mark.asyncio
 async def test_stream_yields_text_deltas(settings, mock_client):
     """stream() should yield text deltas from the API."""
     # Create a mock async context manager for the stream
@@ -84,6 +83,79 @@ async def test_stream_yields_text_deltas(settings, mock_client):
     assert "top_p" not in call_kwargs
 
 
+async def test_stream_marks_static_prompt_prefix_cacheable(settings, mock_client):
+    """A template-built prompt is sent as a cached static block plus the dynamic tail."""
+    mock_stream_ctx = AsyncMock()
+    mock_stream_ctx.__aenter__ = AsyncMock(return_value=mock_stream_ctx)
+    mock_stream_ctx.__aexit__ = AsyncMock(return_value=False)
+    mock_stream_ctx.text_stream = AsyncIteratorMock([])
+    mock_client.messages.stream.return_value = mock_stream_ctx
+
+    prompt = build_system_prompt(["too vague"], mode="precise", temperature=0.2)
+    manager = InferenceManager(mock_client, settings)
+    async for _ in manager.stream(messages=[], system=prompt):
+        pass
+
+    static, dynamic = mock_client.messages.stream.call_args.kwargs["system"]
+    assert static["cache_control"] == {"type": "ephemeral"}
+    assert "cache_control" not in dynamic
+    assert static["text"] + dynamic["text"] == prompt
+    assert "Temperature: 0.2 (precise)" in dynamic["text"]
+    assert "too vague" in dynamic["text"]
+
+
+async def test_stream_skips_cache_control_below_minimum(settings, mock_client):
+    """Once the static prefix is measured too short to cache, prompts go out as plain text."""
+    mock_client.messages.count_tokens = AsyncMock(return_value=MagicMock(input_tokens=10))
+    mock_stream_ctx = AsyncMock()
+    mock_stream_ctx.__aenter__ = AsyncMock(return_value=mock_stream_ctx)
+    mock_stream_ctx.__aexit__ = AsyncMock(return_value=False)
+    mock_client.messages.stream.return_value = mock_stream_ctx
+
+    prompt = build_system_prompt([])
+    manager = InferenceManager(mock_client, settings)
+    for _ in range(2):
+        mock_stream_ctx.text_stream = AsyncIteratorMock([])
+        async for _ in manager.stream(messages=[], system=prompt):
+            pass
+        assert manager._count_task is not None
+        await manager._count_task
+
+    mock_client.messages.count_tokens.assert_awaited_once()
+    assert mock_client.messages.stream.call_args.kwargs["system"] == prompt
+
+
+async def test_cancel_keeps_pending_prefix_measurement(settings, mock_client):
+    """cancel() leaves an unfinished token count running; aclose() stops it."""
+
+    async def hang(**kwargs):
+        await asyncio.sleep(999)
+
+    mock_client.messages.count_tokens = AsyncMock(side_effect=hang)
+    mock_stream_ctx = AsyncMock()
+    mock_stream_ctx.__aenter__ = AsyncMock(return_value=mock_stream_ctx)
+    mock_stream_ctx.__aexit__ = AsyncMock(return_value=False)
+    mock_client.messages.stream.return_value = mock_stream_ctx
+
+    manager = InferenceManager(mock_client, settings)
+    for _ in range(2):
+        mock_stream_ctx.text_stream = AsyncIteratorMock([])
+        async for _ in manager.stream(messages=[], system="prompt"):
+            pass
+        await manager.cancel()
+    await asyncio.sleep(0)  # let the count request start
+    task = manager._count_task
+    assert task is not None
+    assert not task.done()
+    mock_client.messages.count_tokens.assert_called_once()
+
+    await manager.aclose()
+    await asyncio.wait([task])
+
+    assert task.cancelled()
+    assert manager._count_task is None
+
+
 class AsyncIteratorMock:
     """Helper to create an async iterator from a list."""
 
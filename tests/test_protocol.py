@@ -289,3 +289,14 @@ def test_parse_backtrack_with_invalid_temp():
     bt = tokens[0]
     assert isinstance(bt, Backtrack)
     assert bt.temperature is None
+
+
+# --- Reuse ---
+
+
+def test_reset_discards_partial_signal():
+    parser = SignalParser()
+    parser.feed("abandoned <<checkpoint:hal")
+    parser.reset()
+    tokens = collect(parser, "fresh <<checkpoint:b>>")
+    assert tokens == [TextChunk(text="fresh "), Checkpoint(id="b")]
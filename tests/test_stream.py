@@ -3,6 +3,8 @@
 from __future__ import annotations
 
 import asyncio
+from collections import deque
+from collections.abc import Callable
 
 import pytest
 
@@ -17,22 +19,51 @@ class FakeInference:
     Each call to stream() pops the next sequence from the list.
     """
 
+    __slots__ = ("_sequences", "cancel_count")
+
     def __init__(self, sequences: list[list[str]]) -> None:
-        self._sequences = list(sequences)
+        self._sequences = deque(sequences)
         self.cancel_count = 0
 
     async def stream(self, messages, system, mode="balanced", temperature=None):
-        seq = self._sequences.pop(0)
+        seq = self._sequences.popleft()
         for token in seq:
             yield token
 
     async def cancel(self):
         self.cancel_count += 1
 
+    async def aclose(self):
+        await self.cancel()
+
+
+class StallingInference(FakeInference):
+    """FakeInference whose stream stays open after its scripted tokens."""
+
+    __slots__ = ()
+
+    async def stream(self, messages, system, mode="balanced", temperature=None):
+        async for t in super().stream(messages, system, mode, temperature):
+            yield t
+        await asyncio.sleep(999)
+
+
+class YieldingInference(FakeInference):
+    """FakeInference that yields to the event loop before each delta."""
+
+    __slots__ = ()
+
+    async def stream(self, messages, system, mode="balanced", temperature=None):
+        async for t in super().stream(messages, system, mode, temperature):
+            await asyncio.sleep(0)
+            yield t
+
 
 class Callbacks:
     """Collects callback invocations for assertions."""
 
+    __slots__ = ("backtracks", "done", "errors", "texts")
+
     def __init__(self) -> None:
         self.texts: list[str] = []
         self.backtracks: list[tuple[Backtrack, str]] = []
@@ -57,17 +88,36 @@ def settings():
     return Settings(min_tokens_between_signals=0)
 
 
+@pytest.fixture
+def run_scenario(settings):
+    """Run one user message against scripted sequences; return ``(proc, cb)``.
+
+    ``inference`` picks the FakeInference variant, ``cb`` a Callbacks subclass, and
+    ``on_text`` replaces just ``cb.on_text``.
+    """
+
+    async def run(
+        sequences: list[list[str]],
+        prompt: str = "test",
+        settings: Settings = settings,
+        inference: type[FakeInference] = FakeInference,
+        cb: Callbacks | None = None,
+        on_text: Callable | None = None,
+    ) -> tuple[StreamProcessor, Callbacks]:
+        proc = StreamProcessor(inference(sequences), settings)
+        cb = cb if cb is not None else Callbacks()
+        await proc.run(prompt, on_text or cb.on_text, cb.on_backtrack, cb.on_error, cb.on_done)
+        return proc, cb
+
+    return run
+
+
 # --- Normal completion ---
 
 
-@pytest.mark.asyncio
-async def test_normal_completion(settings):
+async def test_normal_completion(run_scenario):
     """Simple response with no signals — on_done called with full text."""
-    fake = FakeInference([["Hello", " world"]])
-    proc = StreamProcessor(fake, settings)
-    cb = Callbacks()
-
-    await proc.run("hi", cb.on_text, cb.on_backtrack, cb.on_error, cb.on_done)
+    _, cb = await run_scenario([["Hello", " world"]], "hi")
 
     assert "".join(cb.texts) == "Hello world"
     assert len(cb.done) == 1
@@ -76,13 +126,85 @@ async def test_normal_completion(settings):
     assert len(cb.errors) == 0
 
 
+async def test_lambda_returning_coroutine_awaited(run_scenario):
+    """A plain callable that returns a coroutine is awaited, not dropped."""
+    texts: list[str] = []
+
+    async def show(t: str) -> None:
+        texts.append(t)
+
+    _, cb = await run_scenario([["Hello", " world"]], on_text=lambda t: show(t))
+
+    assert "".join(texts) == "Hello world"
+    assert cb.done == ["Hello world"]
+
+
+async def test_small_deltas_coalesced(run_scenario):
+    """Deltas arriving back-to-back reach on_text in fewer, larger calls."""
+    tokens = list("Hello, world!")
+    _, cb = await run_scenario([tokens], "hi", inference=YieldingInference)
+
+    assert "".join(cb.texts) == "Hello, world!"
+    assert len(cb.texts) < len(tokens)
+
+
+async def test_text_flush_size_configurable(run_scenario):
+    """With a one-character batch size every delta is flushed on its own."""
+    settings = Settings(min_tokens_between_signals=0, text_flush_chars=1)
+    _, cb = await run_scenario(
+        [["a", "b", "c"]], "hi", settings=settings, inference=YieldingInference
+    )
+
+    assert cb.texts == ["a", "b", "c"]
+
+
+async def test_queued_deltas_parsed_together(run_scenario):
+    """Deltas that pile up behind a slow callback are batched without splitting signals."""
+
+    async def slow_text(t: str) -> None:
+        await asyncio.sleep(0.001)
+
+    settings = Settings(min_tokens_between_signals=0, text_flush_chars=1)
+    tokens = [*"Intro <<checkpoint:a>>", *"bad<<backtrack:a|redo>>"]
+    _, cb = await run_scenario([tokens, ["good"]], "hi", settings=settings, on_text=slow_text)
+
+    assert len(cb.backtracks) == 1
+    assert cb.backtracks[0][1] == "Intro "
+    assert cb.done == ["Intro good"]
+
+
+async def test_text_flushed_before_backtrack(run_scenario):
+    """All pending text is delivered before on_backtrack fires."""
+    events: list[str] = []
+
+    class EventLog(Callbacks):
+        def on_text(self, t: str) -> None:
+            events.append(f"text:{t}")
+
+        def on_backtrack(self, bt: Backtrack, text: str) -> None:
+            events.append("backtrack")
+
+        def on_done(self, text: str) -> None:
+            events.append("done")
+
+    await run_scenario(
+        [
+            ["Intro ", "<<checkpoint:a>>", "bad", " path", "<<backtrack:a|redo>>"],
+            ["good"],
+        ],
+        "hi",
+        cb=EventLog(),
+    )
+
+    assert events == ["text:Intro bad path", "backtrack", "text:good", "done"]
+
+
 # --- Checkpoint + backtrack ---
 
 
-@pytest.mark.asyncio
-async def test_checkpoint_and_backtrack(settings):
+async def test_checkpoint_and_backtrack(run_scenario):
     """Checkpoint followed by backtrack should truncate and retry."""
-    fake = FakeInference(
+    _, cb = await run_scenario(
         [
             # First attempt: checkpoint, some text, then backtrack
             ["<<checkpoint:intro>>", "Wrong start", "<<backtrack:intro|bad framing>>"],
@@ -90,10 +212,6 @@ async def test_checkpoint_and_backtrack(settings):
             ["Good start, better content"],
         ]
     )
-    proc = StreamProcessor(fake, settings)
-    cb = Callbacks()
-
-    await proc.run("test", cb.on_text, cb.on_backtrack, cb.on_error, cb.on_done)
 
     assert len(cb.backtracks) == 1
     bt, truncated_text = cb.backtracks[0]
@@ -103,19 +221,14 @@ async def test_checkpoint_and_backtrack(settings):
     assert cb.done[0] == "Good start, better content"
 
 
-@pytest.mark.asyncio
-async def test_backtrack_preserves_text_before_checkpoint(settings):
+async def test_backtrack_preserves_text_before_checkpoint(run_scenario):
     """Text before checkpoint should survive the backtrack."""
-    fake = FakeInference(
+    _, cb = await run_scenario(
         [
             ["Preamble. ", "<<checkpoint:mid>>", "Bad path", "<<backtrack:mid|wrong>>"],
             ["Better path"],
         ]
     )
-    proc = StreamProcessor(fake, settings)
-    cb = Callbacks()
-
-    await proc.run("test", cb.on_text, cb.on_backtrack, cb.on_error, cb.on_done)
 
     _, truncated = cb.backtracks[0]
     assert truncated == "Preamble. "
@@ -125,7 +238,6 @@ async def test_backtrack_preserves_text_before_checkpoint(settings):
 # --- Multi-turn continuation after backtrack ---
 
 
-@pytest.mark.asyncio
 async def test_retry_uses_multiturn_continuation(settings):
     """Retry after backtrack uses multi-turn (assistant + user) instead of prefill."""
     messages_seen = []
@@ -159,27 +271,78 @@ async def test_retry_uses_multiturn_continuation(settings):
 # --- Unknown checkpoint ID ---
 
 
-@pytest.mark.asyncio
-async def test_unknown_checkpoint_id_ignored(settings):
+async def test_unknown_checkpoint_id_ignored(run_scenario):
     """Backtrack referencing non-existent checkpoint should be silently ignored."""
-    fake = FakeInference(
+    _, cb = await run_scenario(
         [
             ["<<checkpoint:real>>", "text", "<<backtrack:fake|oops>>", " more"],
         ]
     )
-    proc = StreamProcessor(fake, settings)
-    cb = Callbacks()
-
-    await proc.run("test", cb.on_text, cb.on_backtrack, cb.on_error, cb.on_done)
 
     assert len(cb.backtracks) == 0
     assert " more" in "".join(cb.texts)
 
 
+async def test_repeated_backtrack_ignored(run_scenario):
+    """Repeating an already-tried retry is not run again, but is marked and charged."""
+    settings = Settings(max_backtracks=2, min_tokens_between_signals=0)
+    proc, cb = await run_scenario(
+        [
+            ["Intro ", "<<checkpoint:a>>", "bad", "<<backtrack:a|weak>>"],
+            [
+                "<<checkpoint:a>>",
+                "bad again",
+                "<<backtrack:a|weak>>",
+                " kept",
+                "<<backtrack:a|other>>",
+                " end",
+            ],
+        ],
+        settings=settings,
+    )
+
+    assert len(cb.backtracks) == 1
+    assert proc.inference.cancel_count == 1
+    assert cb.errors == []
+    # The repeat used the second budget slot, so the next backtrack is refused.
+    assert cb.done == [
+        "Intro bad again [repeated backtrack ignored]  kept [backtrack budget exhausted]  end"
+    ]
+
+
+async def test_repeated_backtrack_marker_committed(run_scenario):
+    """The rejected text and the repeat marker are committed to the conversation."""
+    proc, _ = await run_scenario(
+        [
+            ["<<checkpoint:a>>", "bad", "<<backtrack:a|weak>>"],
+            ["<<checkpoint:a>>", "bad again", "<<backtrack:a|weak>>", " end"],
+        ]
+    )
+
+    assert proc.messages[-1] == {
+        "role": "assistant",
+        "content": "bad again [repeated backtrack ignored]  end",
+    }
+
+
+@pytest.mark.parametrize("extra", ["|temp:0.9", "|rephrase:shorter"])
+async def test_backtrack_with_new_parameters_retried(run_scenario, extra):
+    """A backtrack that differs only in temperature or rephrase is a new retry."""
+    _, cb = await run_scenario(
+        [
+            ["Intro ", "<<checkpoint:a>>", "bad", "<<backtrack:a|weak>>"],
+            ["<<checkpoint:a>>", "bad again", f"<<backtrack:a|weak{extra}>>"],
+            ["good"],
+        ]
+    )
+
+    assert len(cb.backtracks) == 2
+    assert cb.done == ["Intro good"]
+
+
 # --- Unknown mode ---
 
 
-@pytest.mark.asyncio
 async def test_unknown_mode_falls_back(settings):
     """Backtrack with unknown mode should fall back to current mode."""
     modes_used = []
@@ -208,21 +371,17 @@ async def test_unknown_mode_falls_back(settings):
 # --- Budget exhaustion ---
 
 
-@pytest.mark.asyncio
-async def test_budget_exhaustion():
+async def test_budget_exhaustion(run_scenario):
     """4th backtrack should be rejected with inline text."""
     settings = Settings(max_backtracks=2, min_tokens_between_signals=0)
-    fake = FakeInference(
+    _, cb = await run_scenario(
         [
             ["<<checkpoint:a>>", "try1", "<<backtrack:a|r1>>"],
             ["<<checkpoint:b>>", "try2", "<<backtrack:b|r2>>"],
             ["<<checkpoint:c>>", "try3", "<<backtrack:c|r3>>", " final"],
-        ]
+        ],
+        settings=settings,
     )
-    proc = StreamProcessor(fake, settings)
-    cb = Callbacks()
-
-    await proc.run("test", cb.on_text, cb.on_backtrack, cb.on_error, cb.on_done)
 
     assert len(cb.backtracks) == 2
     combined = "".join(cb.texts)
@@ -232,10 +391,9 @@ async def test_budget_exhaustion():
 # --- Stale checkpoint pruning ---
 
 
-@pytest.mark.asyncio
-async def test_stale_checkpoints_pruned(settings):
+async def test_stale_checkpoints_pruned(run_scenario):
     """Checkpoints from discarded branches should be removed after backtrack."""
-    fake = FakeInference(
+    _, cb = await run_scenario(
         [
             [
                 "<<checkpoint:a>>",
@@ -248,33 +406,48 @@ async def test_stale_checkpoints_pruned(settings):
             ["<<backtrack:b|try to use pruned>>", "ok"],
         ]
     )
-    proc = StreamProcessor(fake, settings)
-    cb = Callbacks()
-
-    await proc.run("test", cb.on_text, cb.on_backtrack, cb.on_error, cb.on_done)
 
     # Only 1 backtrack should succeed (to 'a'), the second ('b') should be ignored
     assert len(cb.backtracks) == 1
     assert cb.backtracks[0][0].checkpoint_id == "a"
 
 
+async def test_reregistered_checkpoint_pruned(run_scenario):
+    """A checkpoint ID placed again later takes its new position for pruning."""
+    _, cb = await run_scenario(
+        [
+            [
+                "<<checkpoint:a>>",
+                "one",
+                "<<checkpoint:b>>",
+                "two",
+                "<<checkpoint:a>>",
+                "three",
+                "<<backtrack:b|wrong>>",
+            ],
+            # 'a' was re-placed after 'b', so rewinding to 'b' discards it
+            ["<<backtrack:a|try to use pruned>>", "ok"],
+        ]
+    )
+
+    assert len(cb.backtracks) == 1
+    assert cb.backtracks[0][0].checkpoint_id == "b"
+    assert cb.done[0] == "oneok"
+
+
 # --- Min tokens between signals ---
 
 
-@pytest.mark.asyncio
-async def test_min_tokens_between_signals():
+async def test_min_tokens_between_signals(run_scenario):
     """Checkpoint placed too soon after another signal should be ignored."""
     settings = Settings(min_tokens_between_signals=10)
-    fake = FakeInference(
+    _, cb = await run_scenario(
         [
             # 'a' accepted (first signal always allowed), 'b' rejected (only 5 chars between)
             ["<<checkpoint:a>>", "short", "<<checkpoint:b>>", "<<backtrack:b|r>>", "end"],
-        ]
+        ],
+        settings=settings,
     )
-    proc = StreamProcessor(fake, settings)
-    cb = Callbacks()
-
-    await proc.run("test", cb.on_text, cb.on_backtrack, cb.on_error, cb.on_done)
 
     # 'b' should be ignored (only 5 chars "short" between signals)
     # backtrack to 'b' should fail (unknown) → no backtracks
@@ -284,19 +457,15 @@ async def test_min_tokens_between_signals():
 # --- API error handling ---
 
 
-@pytest.mark.asyncio
 async def test_api_error_calls_on_error(settings):
     """API errors should call on_error and clean up message state."""
 
-    class FailingInference:
+    class FailingInference(FakeInference):
         async def stream(self, messages, system, mode="balanced", temperature=None):
             raise ConnectionError("network down")
             yield  # make it a generator
 
-        async def cancel(self):
-            pass
-
-    proc = StreamProcessor(FailingInference(), settings)
+    proc = StreamProcessor(FailingInference([]), settings)
     cb = Callbacks()
 
     await proc.run("test", cb.on_text, cb.on_backtrack, cb.on_error, cb.on_done)
@@ -306,10 +475,95 @@ async def test_api_error_calls_on_error(settings):
     assert len(proc.messages) == 0  # user message cleaned up
 
 
+@pytest.mark.parametrize("flush_chars", [1, 64], ids=["mid-stream", "final-flush"])
+async def test_on_text_error_calls_on_error(run_scenario, flush_chars):
+    """A raising on_text reaches on_error and nothing is committed."""
+
+    def on_text(t: str) -> None:
+        raise RuntimeError("display gone")
+
+    settings = Settings(min_tokens_between_signals=0, text_flush_chars=flush_chars)
+    proc, cb = await run_scenario(
+        [["a", "b", "c"]], settings=settings, inference=YieldingInference, on_text=on_text
+    )
+
+    assert len(cb.errors) == 1
+    assert "display gone" in cb.errors[0]
+    assert cb.done == []
+    assert len(proc.messages) == 0
+
+
+async def test_abandoned_stream_closed_before_retry(settings):
+    """On backtrack the old inference stream is shut down before the next one starts."""
+    events = []
+
+    class TrackingInference(FakeInference):
+        async def stream(self, messages, system, mode="balanced", temperature=None):
+            first = not events
+            events.append("open")
+            try:
+                async for t in super().stream(messages, system, mode, temperature):
+                    yield t
+                if first:
+                    await asyncio.sleep(999)  # would keep streaming if not stopped
+            finally:
+                events.append("close")
+
+    fake = TrackingInference(
+        [
+            ["Start ", "<<checkpoint:a>>", "bad ", "<<backtrack:a|redo>>"],
+            ["good"],
+        ]
+    )
+    proc = StreamProcessor(fake, settings)
+    cb = Callbacks()
+
+    await asyncio.wait_for(
+        proc.run("q", cb.on_text, cb.on_backtrack, cb.on_error, cb.on_done), timeout=5
+    )
+
+    assert events == ["open", "close", "open", "close"]
+    assert cb.done == ["Start good"]
+
+
+async def test_stream_closed_when_producer_blocked_on_full_queue(settings):
+    """A stream that filled the delta queue is still closed before the retry starts."""
+    events = []
+    streams = []  # held references: the generators are never garbage-collected mid-test
+
+    class TrackingInference(FakeInference):
+        def stream(self, messages, system, mode="balanced", temperature=None):
+            gen = self._tracked(super().stream(messages, system, mode, temperature))
+            streams.append(gen)
+            return gen
+
+        async def _tracked(self, tokens):
+            events.append("open")
+            try:
+                async for t in tokens:
+                    yield t
+            finally:
+                events.append("close")
+
+    filler = ["x"] * 500  # far more than the queue holds
+    fake = TrackingInference(
+        [
+            ["Start ", "<<checkpoint:a>>", "bad ", "<<backtrack:a|redo>>", *filler],
+            ["good"],
+        ]
+    )
+    proc = StreamProcessor(fake, settings)
+    cb = Callbacks()
+
+    await proc.run("q", cb.on_text, cb.on_backtrack, cb.on_error, cb.on_done)
+
+    assert events == ["open", "close", "open", "close"]
+    assert cb.done == ["Start good"]
+
+
 # --- Backtrack with mode shift ---
 
 
-@pytest.mark.asyncio
 async def test_backtrack_with_mode_shift(settings):
     """Mode shift in backtrack signal should change inference mode."""
     modes_used = []
@@ -337,7 +591,6 @@ async def test_backtrack_with_mode_shift(settings):
 # --- Hints reset between runs ---
 
 
-@pytest.mark.asyncio
 async def test_hints_reset_between_runs(settings):
     """Backtrack hints should not carry over between separate run() calls."""
     systems_seen = []
@@ -370,36 +623,41 @@ async def test_hints_reset_between_runs(settings):
     assert "Constraints for This Attempt" not in systems_seen[2]  # q2 is clean
 
 
-# --- Message history ---
+async def test_system_prompt_reused_when_unchanged(settings):
+    """Runs with the same hints, mode and temperature reuse the built prompt."""
+    systems_seen = []
 
+    class SpyInference(FakeInference):
+        async def stream(self, messages, system, mode="balanced", temperature=None):
+            systems_seen.append(system)
+            async for t in super().stream(messages, system, mode, temperature):
+                yield t
 
-@pytest.mark.asyncio
-async def test_committed_messages_after_success(settings):
-    """Successful completion should commit user + assistant messages."""
-    fake = FakeInference([["Hello!"]])
+    fake = SpyInference([["first"], ["second"]])
     proc = StreamProcessor(fake, settings)
     cb = Callbacks()
 
-    await proc.run("hi", cb.on_text, cb.on_backtrack, cb.on_error, cb.on_done)
+    await proc.run("q1", cb.on_text, cb.on_backtrack, cb.on_error, cb.on_done)
+    await proc.run("q2", cb.on_text, cb.on_backtrack, cb.on_error, cb.on_done)
+
+    assert systems_seen[0] is systems_seen[1]
+
+
+# --- Message history ---
+
+
+async def test_committed_messages_after_success(run_scenario):
+    """Successful completion should commit user + assistant messages."""
+    proc, _ = await run_scenario([["Hello!"]], "hi")
 
     assert len(proc.messages) == 2
     assert proc.messages[0] == {"role": "user", "content": "hi"}
     assert proc.messages[1] == {"role": "assistant", "content": "Hello!"}
 
 
-@pytest.mark.asyncio
 async def test_cancellation_cleans_up_user_message(settings):
     """CancelledError should roll back the pending user message."""
-
-    class HangingInference:
-        async def stream(self, messages, system, mode="balanced", temperature=None):
-            await asyncio.sleep(999)
-            yield ""  # make it a generator
-
-        async def cancel(self):
-            pass
-
-    proc = StreamProcessor(HangingInference(), settings)
+    proc = StreamProcessor(StallingInference([[]]), settings)
     cb = Callbacks()
 
     task = asyncio.create_task(
@@ -413,10 +671,49 @@ async def test_cancellation_cleans_up_user_message(settings):
     assert len(proc.messages) == 0
 
 
+async def test_aclose_cancels_running_inference(settings):
+    """aclose() stops a run mid-stream; the caller's task keeps running."""
+    fake = StallingInference([["Hello"]])
+    proc = StreamProcessor(fake, settings)
+    cb = Callbacks()
+
+    async def caller():
+        await proc.run("test", cb.on_text, cb.on_backtrack, cb.on_error, cb.on_done)
+        await asyncio.sleep(0)  # still alive after the run was closed
+        return "continued"
+
+    task = asyncio.create_task(caller())
+    await asyncio.sleep(0.01)  # let the first delta through
+    await proc.aclose()
+
+    assert await task == "continued"
+    assert fake.cancel_count == 1
+    assert cb.done == []
+    assert cb.errors == []
+    assert len(proc.messages) == 0
+    await proc.aclose()  # nothing running: no-op
+    assert fake.cancel_count == 1
+
+
+async def test_cancelling_caller_cancels_run(settings):
+    """Cancelling the task awaiting run() still cancels it, and the attempt loop."""
+    proc = StreamProcessor(StallingInference([["Hello"]]), settings)
+    cb = Callbacks()
+    task = asyncio.create_task(
+        proc.run("test", cb.on_text, cb.on_backtrack, cb.on_error, cb.on_done)
+    )
+    await asyncio.sleep(0.01)
+    task.cancel()
+    await asyncio.wait([task])
+
+    assert task.cancelled()
+    assert proc._active_run is None
+    assert len(proc.messages) == 0
+
+
 # --- Debug trace format ---
 
 
-@pytest.mark.asyncio
 async def test_debug_trace_emits_text_and_user_lines(settings):
     """Debug trace should emit user: and text: lines, not raw: lines."""
     debug_lines = []
@@ -448,11 +745,10 @@ async def test_debug_trace_emits_text_and_user_lines(settings):
 # --- First checkpoint on retry ---
 
 
-@pytest.mark.asyncio
-async def test_first_checkpoint_allowed_on_retry():
+async def test_first_checkpoint_allowed_on_retry(run_scenario):
     """Checkpoint at the start of a retry branch should be accepted."""
     settings = Settings(min_tokens_between_signals=10)
-    fake = FakeInference(
+    _, cb = await run_scenario(
         [
             # First attempt: checkpoint, enough text, then backtrack
             [
@@ -468,12 +764,9 @@ async def test_first_checkpoint_allowed_on_retry():
             ],
             # Final retry
             ["done"],
-        ]
+        ],
+        settings=settings,
     )
-    proc = StreamProcessor(fake, settings)
-    cb = Callbacks()
-
-    await proc.run("test", cb.on_text, cb.on_backtrack, cb.on_error, cb.on_done)
 
     # Both backtracks should succeed — checkpoint 'b' was accepted on retry
     assert len(cb.backtracks) == 2
@@ -484,7 +777,6 @@ async def test_first_checkpoint_allowed_on_retry():
 # --- Temperature override ---
 
 
-@pytest.mark.asyncio
 async def test_backtrack_with_temperature_override(settings):
     """Temperature in backtrack signal should be passed to inference."""
     temps_used = []
@@ -510,7 +802,6 @@ async def test_backtrack_with_temperature_override(settings):
     assert temps_used == [None, 0.7]
 
 
-@pytest.mark.asyncio
 async def test_backtrack_with_temp_out_of_range(settings):
     """Temperature outside [0.0, 1.0] should be discarded."""
     temps_used = []
@@ -536,7 +827,6 @@ async def test_backtrack_with_temp_out_of_range(settings):
     assert temps_used == [None, None]
 
 
-@pytest.mark.asyncio
 async def test_backtrack_with_temp_and_mode(settings):
     """When both temp and mode specified, temp wins at inference layer."""
     temps_used = []
@@ -565,7 +855,6 @@ async def test_backtrack_with_temp_and_mode(settings):
     assert temps_used == [None, 0.8]
 
 
-@pytest.mark.asyncio
 async def test_system_prompt_includes_temperature(settings):
     """System prompt should contain current temperature and mode state."""
     systems_seen = []
@@ -594,3 +883,24 @@ async def test_system_prompt_includes_temperature(settings):
     # Both should list available modes
     assert "Available modes:" in systems_seen[0]
     assert "Available modes:" in systems_seen[1]
+
+
+async def test_async_callbacks_awaited(settings):
+    """Coroutine callbacks should be awaited just like sync ones are called."""
+    texts: list[str] = []
+    done: list[str] = []
+
+    async def on_text(t: str) -> None:
+        texts.append(t)
+
+    async def on_done(text: str) -> None:
+        done.append(text)
+
+    fake = FakeInference([["Hello", " world"]])
+    proc = StreamProcessor(fake, settings)
+    cb = Callbacks()
+
+    await proc.run("hi", on_text, cb.on_backtrack, cb.on_error, on_done)
+
+    assert "".join(texts) == "Hello world"
+    assert done == ["Hello world"]
@@ -0,0 +1,52 @@
+"""Tests for system prompt assembly."""
+
+from sheldrake.system_prompt import (
+    SYSTEM_PROMPT_TEMPLATE,
+    build_system_prompt,
+    build_system_prompt_parts,
+    sanitize_hint,
+)
+
+
+def test_sanitize_hint_strips_control_chars():
+    assert sanitize_hint("too\x00 tech\tnical\x7f") == "too technical"
+
+
+def test_sanitize_hint_strips_unicode_separators():
+    assert sanitize_hint("line\u2028break\x85here") == "linebreakhere"
+
+
+def test_sanitize_hint_keeps_printable_unicode():
+    assert sanitize_hint("naïve — framing") == "naïve — framing"
+
+
+def test_sanitize_hint_bounds_length():
+    assert sanitize_hint("a" * 300, max_length=10) == "a" * 10
+
+
+def test_build_system_prompt_matches_template():
+    """Prompt without hints is the template with only the state section filled in."""
+    prompt = build_system_prompt([])
+    head = SYSTEM_PROMPT_TEMPLATE.split("{backtrack_hints}")[0]
+    assert prompt.startswith(head)
+    assert "{backtrack_hints}" not in prompt
+    assert "Constraints for This Attempt" not in prompt
+
+
+def test_build_system_prompt_with_hints():
+    prompt = build_system_prompt(["first\x00 issue", "second issue"])
+    assert prompt.endswith("- Avoid: first issue\n- Avoid: second issue\n")
+
+
+def test_build_system_prompt_lists_modes():
+    assert "Available modes: precise (0.2), exploratory (0.9)" in build_system_prompt([])
+    custom = {"calm": {"temperature": 0.1}}
+    assert "Available modes: calm (0.1)\n" in build_system_prompt([], modes=custom)
+    assert "Available modes: calm (0.1)\n" in build_system_prompt([], modes=custom)
+
+
+def test_build_system_prompt_parts_split_static_prefix():
+    static, dynamic = build_system_prompt_parts(["first issue"], mode="precise", temperature=0.2)
+    assert static is build_system_prompt_parts([])[0]
+    assert static + dynamic == build_system_prompt(["first issue"], mode="precise", temperature=0.2)
+    assert dynamic.startswith("\n\n## Current Generation State\n")
@@ -0,0 +1,20 @@
+"""Tests for the platform-independent helpers of the Win32 key patch."""
+
+from sheldrake._win32_keys import _join_utf16
+
+
+def test_join_utf16_ascii():
+    assert _join_utf16(list("hello\r")) == "hello\r"
+
+
+def test_join_utf16_bmp_passthrough():
+    assert _join_utf16(list("naïve")) == "naïve"
+
+
+def test_join_utf16_combines_surrogate_pair():
+    units = ["a", "\ud83d", "\ude00", "b"]
+    assert _join_utf16(units) == "a😀b"
+
+
+def test_join_utf16_keeps_lone_surrogate():
+    assert _join_utf16(["\ud83d", "x"]) == "\ud83dx"